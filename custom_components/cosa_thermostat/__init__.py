@@ -1,85 +1,179 @@
 """The Cosa Thermostat integration."""
-from datetime import timedelta
 import logging
-import aiohttp
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.components import webhook
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_WEBHOOK_ID
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     DOMAIN,
+    DATA_ACCOUNTS,
     API_BASE_URL,
-    API_GET_ENDPOINT,
+    CONF_API_BASE_URL,
+    CONF_FAST_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_FAST_WINDOW,
+    CONF_STALE_GRACE,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_PUBLISH_INTERVAL,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_FAST_WINDOW,
+    DEFAULT_STALE_GRACE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_PUBLISH_INTERVAL,
 )
+from .auth import CosaAuth
+from .coordinator import CosaAccountCoordinator, snapshot_store
+from .runtime import async_remove_runtime
+from .thermal import async_remove_thermal_model
+from .services import async_setup_services
+from .telemetry import CosaTelemetryBackfill
+from .webhook import async_register_webhook
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[str] = ["climate", "sensor"]
-UPDATE_INTERVAL = timedelta(seconds=10)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Cosa Thermostat services."""
+    async_setup_services(hass)
+    return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Cosa Thermostat from a config entry."""
     device_id = entry.data["device_id"]
     auth_token = entry.data["auth_token"]
+    email = entry.data[CONF_EMAIL]
+    base_url = entry.data.get(CONF_API_BASE_URL, API_BASE_URL)
+
+    hass.data.setdefault(DOMAIN, {})
+    accounts = hass.data[DOMAIN].setdefault(DATA_ACCOUNTS, {})
 
-    async def async_update_data():
-        """Fetch data from API endpoint."""
-        try:
-            session = async_get_clientsession(hass)
-            headers = {"authToken": auth_token}
-            
-            _LOGGER.debug("Fetching data for device %s", device_id)
-            
-            async with session.post(
-                f"{API_BASE_URL}{API_GET_ENDPOINT}",
-                headers=headers,
-                json={"endpoint": device_id}
-            ) as response:
-                if response.status != 200:
-                    _LOGGER.error(
-                        "Error fetching data: %s, %s",
-                        response.status,
-                        await response.text()
-                    )
-                    raise UpdateFailed(f"Error communicating with API: {response.status}")
-                
-                data = await response.json()
-                _LOGGER.debug("Received data: %s", data)
-                return data
-                
-        except Exception as err:
-            _LOGGER.exception("Error updating data: %s", err)
-            raise UpdateFailed(f"Error communicating with API: {err}")
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"Cosa Thermostat {device_id}",
-        update_method=async_update_data,
-        update_interval=UPDATE_INTERVAL,
+    # Aynı hesaptaki tüm termostatlar tek coordinator'ı paylaşır
+    coordinator: CosaAccountCoordinator | None = accounts.get(email)
+    if coordinator is None:
+        auth = CosaAuth(
+            hass, email, entry.data[CONF_PASSWORD], auth_token, base_url
+        )
+        coordinator = CosaAccountCoordinator(hass, auth, base_url)
+        accounts[email] = coordinator
+    else:
+        coordinator.auth.update_credentials(entry.data[CONF_PASSWORD], auth_token)
+
+    coordinator.add_device(device_id)
+    await coordinator.runtime[device_id].async_load()
+    await coordinator.thermal[device_id].async_load()
+    coordinator.set_poll_intervals(
+        device_id,
+        entry.options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+        entry.options.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL),
+        entry.options.get(CONF_FAST_WINDOW, DEFAULT_FAST_WINDOW),
+    )
+    coordinator.set_stale_grace(
+        device_id, entry.options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE)
+    )
+    coordinator.set_rate_limit(
+        device_id,
+        entry.options.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE),
+    )
+    coordinator.set_publish_limits(
+        device_id,
+        entry.options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND),
+        entry.options.get(CONF_HUMIDITY_DEADBAND, DEFAULT_HUMIDITY_DEADBAND),
+        entry.options.get(CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL),
     )
 
     # Store coordinator
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    # Kayıtlı son durum varsa bulutu beklemeden başla
+    if coordinator.reported_endpoint(device_id) is None:
+        if await coordinator.async_restore_device(device_id):
+            entry.async_create_background_task(
+                hass,
+                coordinator.async_request_refresh(),
+                f"{DOMAIN} first refresh {device_id}",
+            )
+        elif not await coordinator.async_refresh_device(device_id):
+            # Hesabın son cihazıysa coordinator da kapatılır
+            if _release_device(hass, entry) is not None:
+                await coordinator.async_shutdown()
+            if isinstance(coordinator.last_exception, ConfigEntryAuthFailed):
+                raise coordinator.last_exception
+            raise ConfigEntryNotReady(
+                f"Unable to fetch data for device {device_id}"
+            )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    options = dict(entry.options)
+
+    async def _async_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the entry when its options change."""
+        # Token yenilemesi de entry'yi günceller, sadece ayar değişince yeniden yükle
+        if dict(entry.options) != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(_async_entry_updated))
+
+    # Durum push'ları için webhook, polling yedek olarak kalır
+    if (webhook_id := entry.data.get(CONF_WEBHOOK_ID)) is None:
+        webhook_id = webhook.async_generate_id()
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_WEBHOOK_ID: webhook_id}
+        )
+        _LOGGER.info(
+            "State pushes for %s are accepted at %s",
+            entry.title,
+            webhook.async_generate_path(webhook_id),
+        )
+    entry.async_on_unload(
+        async_register_webhook(hass, coordinator, webhook_id, entry.title)
+    )
+
+    # Eksik geçmişi uzun dönem istatistiklere doldur
+    backfill = CosaTelemetryBackfill(hass, coordinator, device_id)
+    entry.async_on_unload(backfill.async_start(entry))
+
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = _release_device(hass, entry)
+        if coordinator is not None:
+            await coordinator.async_shutdown()
+
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the saved state of a deleted entry."""
+    await snapshot_store(hass, entry.data["device_id"]).async_remove()
+    await async_remove_runtime(hass, entry.data["device_id"])
+    await async_remove_thermal_model(hass, entry.data["device_id"])
+
+def _release_device(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> CosaAccountCoordinator | None:
+    """Detach an entry from its account coordinator.
+
+    Returns the coordinator when it no longer tracks any device.
+    """
+    coordinator: CosaAccountCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+    coordinator.remove_device(entry.data["device_id"])
+    if coordinator.device_ids:
+        return None
 
-    return unload_ok 
\ No newline at end of file
+    hass.data[DOMAIN][DATA_ACCOUNTS].pop(coordinator.email, None)
+    return coordinator
@@ -0,0 +1,282 @@
+"""Async HTTP client for the Cosa cloud API.
+
+The client needs an aiohttp session but no hass instance, and imports
+nothing from Home Assistant, so it can be driven directly against a test
+server.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import json
+import logging
+import random
+import time
+from typing import Any, TypedDict
+
+import aiohttp
+
+from .protocol import (
+    API_BASE_URL,
+    API_GET_ENDPOINT,
+    API_GET_ENDPOINTS,
+    API_GET_TELEMETRIES,
+    API_LOGIN,
+    PRIORITY_POLL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Yol başına toplam istek süresi sınırı (saniye)
+DEFAULT_TIMEOUT = 10.0
+TIMEOUTS = {
+    API_LOGIN: 15.0,
+    API_GET_ENDPOINTS: 15.0,
+    API_GET_ENDPOINT: 10.0,
+    API_GET_TELEMETRIES: 30.0,
+}
+
+# Sunucu durumunu değiştirmeyen çağrılar her hatada tekrar denenebilir
+IDEMPOTENT_PATHS = frozenset(
+    {API_LOGIN, API_GET_ENDPOINTS, API_GET_ENDPOINT, API_GET_TELEMETRIES}
+)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 5.0
+
+RequestHook = Callable[[str, int | str, float, int, str | None], None]
+
+
+class Endpoint(TypedDict, total=False):
+    """Thermostat state as returned by getEndpoint(s)."""
+
+    id: str
+    name: str
+    temperature: float
+    humidity: float
+    option: str
+    mode: str
+    previousOption: str
+    previousMode: str
+    operationMode: str
+    combiState: str
+    homeTemperature: float
+    awayTemperature: float
+    sleepTemperature: float
+    customTemperature: float
+
+
+class LoginResponse(TypedDict):
+    """Body of a successful login."""
+
+    authToken: str
+
+
+class EndpointsResponse(TypedDict, total=False):
+    """Body of getEndpoints."""
+
+    endpoints: list[Endpoint]
+
+
+class EndpointResponse(TypedDict, total=False):
+    """Body of getEndpoint."""
+
+    endpoint: Endpoint
+
+
+class TelemetriesResponse(TypedDict, total=False):
+    """Body of getTelemetries."""
+
+    telemetries: list[dict[str, Any]]
+
+
+@dataclass(slots=True, frozen=True)
+class CosaResponse:
+    """Status, raw body and ETag of one HTTP response."""
+
+    status: int
+    body: bytes
+    etag: str | None = None
+
+    @property
+    def text(self) -> str:
+        """Return the body as text."""
+        return self.body.decode(errors="replace")
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json.loads(self.body)
+
+
+class CosaApiError(Exception):
+    """Error to indicate the API answered with an unexpected status."""
+
+    def __init__(self, status: int, body: str) -> None:
+        """Initialize the error."""
+        super().__init__(f"Error communicating with API: {status}")
+        self.status = status
+        self.body = body
+
+
+class CosaAuthError(CosaApiError):
+    """Error to indicate the API rejected the credentials."""
+
+
+class CosaApiClient:
+    """Send requests to the Cosa cloud over a shared session.
+
+    The session's connection pool keeps connections to the cloud alive
+    between calls. Every call is bounded by a timeout chosen per path.
+    Reads and logins are retried on timeouts, connection errors and 429/5xx
+    answers with jittered exponential backoff. Commands are only retried
+    when the connection could not be opened or the API answered 429, since
+    in both cases the write never reached the device.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str = API_BASE_URL,
+        *,
+        on_request: RequestHook | None = None,
+        throttle: Callable[[int], Awaitable[Any]] | None = None,
+    ) -> None:
+        """Initialize the client.
+
+        on_request is called after every HTTP attempt with the path, status
+        (or exception name), elapsed seconds, body size and device id.
+        throttle is awaited with the request priority before every attempt.
+        """
+        self._session = session
+        self.base_url = base_url
+        self._on_request = on_request
+        self._throttle = throttle
+
+    async def async_request(
+        self,
+        method: str,
+        path: str,
+        *,
+        token: str | None = None,
+        data: dict[str, Any] | None = None,
+        etag: str | None = None,
+        priority: int = PRIORITY_POLL,
+    ) -> CosaResponse:
+        """Send a request, retrying transient failures when it is safe.
+
+        Returns the last response whatever its status; raises the last
+        aiohttp.ClientError or TimeoutError when no response was received.
+        """
+        headers: dict[str, str] = {}
+        if token is not None:
+            headers["authToken"] = token
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        timeout = aiohttp.ClientTimeout(total=TIMEOUTS.get(path, DEFAULT_TIMEOUT))
+        idempotent = path in IDEMPOTENT_PATHS
+
+        attempt = 1
+        while True:
+            if self._throttle is not None:
+                await self._throttle(priority)
+            try:
+                response = await self._async_send(method, path, headers, data, timeout)
+            except (aiohttp.ClientError, TimeoutError) as err:
+                if attempt >= MAX_ATTEMPTS or not (
+                    idempotent or isinstance(err, aiohttp.ClientConnectorError)
+                ):
+                    raise
+                reason: int | str = type(err).__name__
+            else:
+                if (
+                    attempt >= MAX_ATTEMPTS
+                    or response.status not in RETRY_STATUSES
+                    or not (idempotent or response.status == 429)
+                ):
+                    return response
+                reason = response.status
+
+            delay = _backoff(attempt)
+            _LOGGER.debug(
+                "Retrying %s after %s in %.2f seconds (attempt %s of %s)",
+                path,
+                reason,
+                delay,
+                attempt + 1,
+                MAX_ATTEMPTS,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _async_send(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        data: dict[str, Any] | None,
+        timeout: aiohttp.ClientTimeout,
+    ) -> CosaResponse:
+        """Send one HTTP request and report it to the request hook."""
+        start = time.perf_counter()
+        status: int | str = "error"
+        body = b""
+
+        try:
+            async with self._session.request(
+                method,
+                f"{self.base_url}{path}",
+                headers=headers,
+                json=data,
+                timeout=timeout,
+            ) as response:
+                status = response.status
+                body = await response.read()
+                etag = response.headers.get("ETag")
+        except Exception as ex:
+            status = type(ex).__name__
+            raise
+        finally:
+            if self._on_request is not None:
+                self._on_request(
+                    path,
+                    status,
+                    time.perf_counter() - start,
+                    len(body),
+                    (data or {}).get("endpoint"),
+                )
+
+        return CosaResponse(response.status, body, etag)
+
+    async def async_login(self, email: str, password: str) -> LoginResponse:
+        """Log in and return the body holding the auth token."""
+        response = await self.async_request(
+            "post", API_LOGIN, data={"email": email, "password": password}
+        )
+        # 5xx/429 bir kesinti olabilir, kimlik bilgisi reddi değildir
+        if 400 <= response.status < 500 and response.status != 429:
+            raise CosaAuthError(response.status, response.text)
+        if response.status != 200:
+            raise CosaApiError(response.status, response.text)
+
+        response_data = response.json()
+        if "authToken" not in response_data:
+            raise CosaAuthError(response.status, "No auth token in the response")
+        return response_data
+
+    async def async_get_endpoints(
+        self, token: str, priority: int = PRIORITY_POLL
+    ) -> EndpointsResponse:
+        """Return every endpoint of the account."""
+        response = await self.async_request(
+            "get", API_GET_ENDPOINTS, token=token, priority=priority
+        )
+        if response.status != 200:
+            raise CosaApiError(response.status, response.text)
+        return response.json()
+
+
+def _backoff(attempt: int) -> float:
+    """Return the delay before the next attempt, with full jitter."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
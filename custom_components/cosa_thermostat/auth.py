@@ -0,0 +1,102 @@
+"""Auth token lifecycle for Cosa Thermostat accounts."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import CosaApiClient, CosaApiError, CosaAuthError
+from .const import DOMAIN, API_BASE_URL
+from .metrics import get_metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CosaAuth:
+    """Hold the auth token of an account and renew it on demand.
+
+    Every poller and command of the account reads the token from here. When
+    one of them gets a 401/403 it calls async_relogin with the token it used;
+    the first caller logs in again and everyone else waits on the same login
+    instead of starting their own.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        email: str,
+        password: str,
+        token: str,
+        base_url: str = API_BASE_URL,
+    ) -> None:
+        """Initialize the auth manager."""
+        self._hass = hass
+        self.email = email
+        self._password = password
+        self.token = token
+        self._lock = asyncio.Lock()
+        self._client = CosaApiClient(
+            async_get_clientsession(hass),
+            base_url,
+            on_request=get_metrics(hass, email).record_request,
+        )
+
+    def update_credentials(self, password: str, token: str) -> None:
+        """Adopt credentials changed by a reauth flow."""
+        if password != self._password:
+            self._password = password
+            self.token = token
+
+    async def async_relogin(self, rejected_token: str) -> str:
+        """Return a fresh token after the API rejected rejected_token."""
+        async with self._lock:
+            # Başka bir istek token'ı zaten yenilediyse tekrar login olma
+            if self.token != rejected_token:
+                return self.token
+
+            _LOGGER.info("Auth token for %s expired, logging in again", self.email)
+            try:
+                self.token = await self._async_login()
+            except ConfigEntryAuthFailed:
+                for entry in self._async_account_entries():
+                    entry.async_start_reauth(self._hass)
+                raise
+
+            self._async_persist_token()
+            return self.token
+
+    async def _async_login(self) -> str:
+        """Log in with the stored credentials."""
+        try:
+            response_data = await self._client.async_login(self.email, self._password)
+        except CosaAuthError as err:
+            raise ConfigEntryAuthFailed(
+                f"Credentials for {self.email} were rejected: {err.status}"
+            ) from err
+        except CosaApiError as err:
+            raise HomeAssistantError(f"Login failed: {err.status}") from err
+        return response_data["authToken"]
+
+    @callback
+    def _async_persist_token(self) -> None:
+        """Write the new token back to every entry of the account."""
+        for entry in self._async_account_entries():
+            if entry.data.get("auth_token") == self.token:
+                continue
+            self._hass.config_entries.async_update_entry(
+                entry, data={**entry.data, "auth_token": self.token}
+            )
+
+    @callback
+    def _async_account_entries(self) -> list[ConfigEntry]:
+        """Return the config entries that belong to this account."""
+        return [
+            entry
+            for entry in self._hass.config_entries.async_entries(DOMAIN)
+            if entry.data.get(CONF_EMAIL) == self.email
+        ]
@@ -0,0 +1,80 @@
+"""Circuit breaker for Cosa cloud polling."""
+from __future__ import annotations
+
+import logging
+import random
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 3
+BASE_BACKOFF = 30
+MAX_BACKOFF = 600
+JITTER = 0.2
+
+
+class CosaCircuitBreaker:
+    """Stop polling a failing cloud and probe it with backoff.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens for an
+    exponentially growing, jittered period. When that period ends a single
+    request is let through; its result closes the circuit or opens it again
+    for longer.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize the breaker."""
+        self._name = name
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._open_until = 0.0
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self._open_until:
+            # Tek bir deneme isteğine izin ver
+            self.state = STATE_HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> bool:
+        """Close the circuit; return True if it was not closed before."""
+        recovered = self.state != STATE_CLOSED
+        if recovered:
+            _LOGGER.info("%s recovered after %s failures", self._name, self.failures)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        return recovered
+
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit when the threshold is hit."""
+        self.failures += 1
+        if self.failures < FAILURE_THRESHOLD and self.state == STATE_CLOSED:
+            return
+
+        backoff = min(
+            BASE_BACKOFF * 2 ** (self.failures - FAILURE_THRESHOLD), MAX_BACKOFF
+        )
+        backoff *= random.uniform(1 - JITTER, 1 + JITTER)
+        if self.state == STATE_CLOSED:
+            _LOGGER.warning(
+                "%s failed %s times in a row, backing off for %.0f seconds",
+                self._name,
+                self.failures,
+                backoff,
+            )
+        else:
+            _LOGGER.debug("%s probe failed, backing off for %.0f seconds", self._name, backoff)
+        self.state = STATE_OPEN
+        self._open_until = time.monotonic() + backoff
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds left until the next probe."""
+        return max(self._open_until - time.monotonic(), 0.0)
@@ -2,9 +2,8 @@
 from __future__ import annotations
 
 import logging
-import asyncio
+import time
 from typing import Any
-from datetime import timedelta
 
 from homeassistant.components.climate import (
     ClimateEntity,
@@ -18,27 +17,17 @@ from homeassistant.const import (
     UnitOfTemperature,
 )
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
-    DataUpdateCoordinator,
 )
 
-from .const import (
-    DOMAIN,
-    API_BASE_URL,
-    API_SET_TARGET_TEMPERATURES,
-    API_SET_MODE,
-    API_SET_OPTION,
-    API_SET_OPERATION_MODE,
-)
+from .const import DOMAIN
+from .coordinator import CosaAccountCoordinator
+from .models import CosaSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
-# Her 30 saniyede bir güncelleme yap
-SCAN_INTERVAL = timedelta(seconds=10)
-
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -51,9 +40,6 @@ async def async_setup_entry(
     device_id = config_entry.data["device_id"]
     auth_token = config_entry.data["auth_token"]
 
-    # Coordinator'ın ilk verileri almasını bekle
-    await coordinator.async_config_entry_first_refresh()
-
     thermostat = CosaThermostat(
         coordinator=coordinator,
         config_data={
@@ -82,18 +68,18 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
         ClimateEntityFeature.PRESET_MODE
     )
 
-    def __init__(self, coordinator: DataUpdateCoordinator, config_data: dict) -> None:
+    def __init__(self, coordinator: CosaAccountCoordinator, config_data: dict) -> None:
         """Initialize the thermostat."""
         super().__init__(coordinator)
         
         self._device_id = config_data["device_id"]
         self._auth_token = config_data["auth_token"]
+        self._command_queue = coordinator.command_queues[self._device_id]
         
         # API'den gelen name değerini al
         device_name = None
-        if self.coordinator.data:
-            endpoint_data = self.coordinator.data.get("endpoint", {})
-            device_name = endpoint_data.get("name")
+        if snapshot := self.coordinator.snapshot(self._device_id):
+            device_name = snapshot.name
         
         # Unique ID'yi ayarla
         self._attr_unique_id = f"{DOMAIN}_{self._device_id}"
@@ -121,6 +107,11 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
         self._VALID_OPTIONS = ["frozen", "home", "sleep", "away", "custom","auto","schedule"]
         self._VALID_MODES = ["manual", "auto", "schedule"]
         self._VALID_OPERATION_MODES = ["heating", "cooling", "remote"]
+        self._last_written_state: tuple | None = None
+        # Ölçüm titreşimi her poll'da durum yazdırmasın
+        self._temperature_filter = coordinator.deadband(self._device_id, "temperature")
+        self._humidity_filter = coordinator.deadband(self._device_id, "humidity")
+        self._measured_endpoint: dict[str, Any] | None = None
 
     @property
     def current_temperature(self) -> float | None:
@@ -160,123 +151,139 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return self.coordinator.last_update_success
+        return self.coordinator.device_available(self._device_id)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the upcoming schedule change and flag stale data."""
+        attributes: dict[str, Any] = {}
+        if transition := self.coordinator.next_transition(self._device_id):
+            at, option = transition
+            attributes["next_transition"] = at.isoformat()
+            attributes["next_preset"] = option
+            attributes["next_target_temperature"] = target = (
+                self._target_temperatures.get(option)
+            )
+            # Hedefe geçiş anında ulaşmak için ısıtmanın başlaması gereken an
+            if target is not None and self._attr_current_temperature is not None:
+                estimate = self.coordinator.thermal[self._device_id].time_to_target(
+                    self._attr_current_temperature, target
+                )
+                if estimate:
+                    attributes["preheat_start"] = (at - estimate).isoformat()
+        if self.coordinator.stale:
+            attributes["stale"] = True
+            attributes["stale_since"] = self.coordinator.stale_since.isoformat()
+        return attributes or None
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        _LOGGER.debug("Coordinator update received: %s", self.coordinator.data)
-        
-        if not self.coordinator.data:
-            _LOGGER.warning("No data received from coordinator")
-            return
+        start = time.perf_counter()
+        snapshot = self.coordinator.snapshot(self._device_id)
 
-        try:
-            endpoint = self.coordinator.data.get("endpoint", {})
-            _LOGGER.debug("Processing endpoint data: %s", endpoint)
-            
-            if not endpoint:
-                _LOGGER.warning("No endpoint data in coordinator update")
-                return
-            
-            # Cihaz ismini güncelle
-            if device_name := endpoint.get("name"):
-                self._attr_name = device_name
-            
-            # Sıcaklık değerlerini güncelle
-            self._target_temperatures = {
-                "home": endpoint.get("homeTemperature"),
-                "away": endpoint.get("awayTemperature"),
-                "sleep": endpoint.get("sleepTemperature"),
-                "custom": endpoint.get("customTemperature")
-            }
-            
-            # Mevcut sıcaklık ve nem
-            self._attr_current_temperature = endpoint.get("temperature")
-            self._attr_current_humidity = endpoint.get("humidity")
-            
-            _LOGGER.debug(
-                "Updated temperatures - Current: %s, Targets: %s",
-                self._attr_current_temperature,
-                self._target_temperatures
+        if snapshot is None:
+            _LOGGER.warning("No data received from coordinator")
+        else:
+            try:
+                self._apply_snapshot(snapshot)
+            except Exception as ex:
+                _LOGGER.exception("Error handling coordinator update: %s", ex)
+
+        # Sadece görünen durum değiştiyse yaz
+        state = self._state_key()
+        if state != self._last_written_state:
+            self._last_written_state = state
+            self.async_write_ha_state()
+
+        self.coordinator.metrics.record_update(
+            self._device_id, time.perf_counter() - start
+        )
+
+    def _apply_snapshot(self, snapshot: CosaSnapshot) -> None:
+        """Update the entity attributes from a parsed endpoint."""
+        # Cihaz ismini güncelle
+        if snapshot.name:
+            self._attr_name = snapshot.name
+
+        # Sıcaklık değerlerini güncelle
+        self._target_temperatures = dict(snapshot.target_temperatures)
+
+        # Mevcut sıcaklık ve nem; filtreye sadece yeni poll veya push ölçümü
+        # girer, iyimser yazmalar ve diğer bildirimler ortalamayı etkilemez
+        reported = self.coordinator.reported_endpoint(self._device_id)
+        if reported is not self._measured_endpoint:
+            self._measured_endpoint = reported
+            self._attr_current_temperature = self._temperature_filter.update(
+                snapshot.temperature
             )
-            
-            # Option ve mode bilgilerini güncelle
-            current_option = endpoint.get("option")
-            current_mode = endpoint.get("mode")
-            
-            _LOGGER.debug("Current option: %s, mode: %s", current_option, current_mode)
-            
-            if current_option == "frozen":
-                self._attr_hvac_mode = HVACMode.OFF
-                self._attr_hvac_action = HVACAction.OFF
-            else:
-                if current_mode == "auto":
-                    self._attr_hvac_mode = HVACMode.HEAT
-                    self._attr_preset_mode = "auto"
-                elif current_mode == "manual":
-                    self._attr_hvac_mode = HVACMode.HEAT
-                    if current_option in self._attr_preset_modes:
-                        self._attr_preset_mode = current_option
-                elif current_mode == "schedule":
-                    self._attr_hvac_mode = HVACMode.HEAT
-                    self._attr_preset_mode = "schedule"
-
-            
-            
-            # Previous option ve mode bilgilerini güncelle
-            previous_option = endpoint.get("previousOption")
-            previous_mode = endpoint.get("previousMode")
-            if previous_option == "frozen":
-                self._attr_previous_hvac_mode = HVACMode.OFF
-                self._attr_previous_hvac_action = HVACAction.OFF
-            else:
-                if previous_mode == "auto":
-                    self._attr_previous_hvac_mode = HVACMode.HEAT
-                    self._attr_previous_preset_mode = "auto"
-                elif previous_mode == "manual":
-                    self._attr_previous_hvac_mode = HVACMode.HEAT
-                    if previous_option in self._attr_preset_modes:
-                        self._attr_previous_preset_mode = previous_option
-                elif previous_mode == "schedule":
-                    self._attr_previous_hvac_mode = HVACMode.HEAT
-                    self._attr_previous_preset_mode = "schedule"
-
-            # Kombi durumunu kontrol et
-            combi_state = endpoint.get("combiState")
-            operation_mode = endpoint.get("operationMode")
-           
-            
-            # HVAC action güncelleme
-            if self._attr_hvac_mode == HVACMode.OFF:
-                self._attr_hvac_action = HVACAction.OFF
-            elif operation_mode == "heating" and combi_state == "on":
-                self._attr_hvac_action = HVACAction.HEATING
-                _LOGGER.debug("Combi is actively heating")
-            else:
-                self._attr_hvac_action = HVACAction.IDLE
-                _LOGGER.debug("Combi is idle")
-            
-            # Aktif modun hedef sıcaklığını ayarla
-            if current_option in self._target_temperatures:
-                self._attr_target_temperature = self._target_temperatures[current_option]
-            
-            _LOGGER.debug(
-                "Updated state - Current Temp: %s, Target Temp: %s, Mode: %s, Action: %s, "
-                "Combi State: %s, Operation Mode: %s, Option: %s",
-                self._attr_current_temperature,
-                self._attr_target_temperature,
-                self._attr_hvac_mode,
-                self._attr_hvac_action,
-                combi_state,
-                operation_mode,
-                current_option
+            self._attr_current_humidity = self._humidity_filter.update(
+                snapshot.humidity
             )
-            
-        except Exception as ex:
-            _LOGGER.exception("Error handling coordinator update: %s", ex)
 
-        self.async_write_ha_state()
+        # Option ve mode bilgilerini güncelle
+        current_option = snapshot.option
+        current_mode = snapshot.mode
+
+        if current_option == "frozen":
+            self._attr_hvac_mode = HVACMode.OFF
+            self._attr_hvac_action = HVACAction.OFF
+        else:
+            if current_mode == "auto":
+                self._attr_hvac_mode = HVACMode.HEAT
+                self._attr_preset_mode = "auto"
+            elif current_mode == "manual":
+                self._attr_hvac_mode = HVACMode.HEAT
+                if current_option in self._attr_preset_modes:
+                    self._attr_preset_mode = current_option
+            elif current_mode == "schedule":
+                self._attr_hvac_mode = HVACMode.HEAT
+                self._attr_preset_mode = "schedule"
+
+        # Previous option ve mode bilgilerini güncelle
+        previous_option = snapshot.previous_option
+        previous_mode = snapshot.previous_mode
+        if previous_option == "frozen":
+            self._attr_previous_hvac_mode = HVACMode.OFF
+            self._attr_previous_hvac_action = HVACAction.OFF
+        else:
+            if previous_mode == "auto":
+                self._attr_previous_hvac_mode = HVACMode.HEAT
+                self._attr_previous_preset_mode = "auto"
+            elif previous_mode == "manual":
+                self._attr_previous_hvac_mode = HVACMode.HEAT
+                if previous_option in self._attr_preset_modes:
+                    self._attr_previous_preset_mode = previous_option
+            elif previous_mode == "schedule":
+                self._attr_previous_hvac_mode = HVACMode.HEAT
+                self._attr_previous_preset_mode = "schedule"
+
+        # HVAC action güncelleme
+        if self._attr_hvac_mode == HVACMode.OFF:
+            self._attr_hvac_action = HVACAction.OFF
+        elif snapshot.heating:
+            self._attr_hvac_action = HVACAction.HEATING
+        else:
+            self._attr_hvac_action = HVACAction.IDLE
+
+        # Aktif modun hedef sıcaklığını ayarla
+        if current_option in self._target_temperatures:
+            self._attr_target_temperature = self._target_temperatures[current_option]
+
+    def _state_key(self) -> tuple:
+        """Return the values that make up the entity state."""
+        return (
+            self.available,
+            self.coordinator.stale_since,
+            self._attr_name,
+            self._attr_current_temperature,
+            self._attr_current_humidity,
+            self._attr_target_temperature,
+            self._attr_hvac_mode,
+            self._attr_hvac_action,
+            self._attr_preset_mode,
+            self.coordinator.next_transition(self._device_id),
+        )
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
@@ -289,9 +296,6 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
         if temperature is None:
             return
 
-        # Önce mode'u manual'e çek
-        await self._set_mode("manual")
-        
         # Mevcut option için sıcaklığı güncelle
         current_option = self._attr_preset_mode
         if current_option not in self._target_temperatures:
@@ -301,41 +305,14 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
         # Tüm sıcaklıkları kopyala ve aktif modu güncelle
         new_temperatures = dict(self._target_temperatures)
         new_temperatures[current_option] = temperature
-        
-        session = async_get_clientsession(self.hass)
-        headers = {"authToken": self._auth_token}
-        data = {
-            "endpoint": self._device_id,
-            "targetTemperatures": new_temperatures
-        }
-        
-        _LOGGER.debug("Setting temperature with data: %s", data)
-        
-        try:
-            async with session.post(
-                f"{API_BASE_URL}{API_SET_TARGET_TEMPERATURES}",
-                headers=headers,
-                json=data
-            ) as response:
-                if response.status == 200:
-                    # Yerel değerleri güncelle
-                    self._target_temperatures = new_temperatures
-                    self._attr_target_temperature = temperature
-                    _LOGGER.debug("Temperature set successfully. Refreshing state...")
-                    # API'nin güncellenmesi için kısa bir süre bekle
-                    await asyncio.sleep(1)
-                    # Veriyi güncelle
-                    await self.coordinator.async_refresh()
-                else:
-                    response_text = await response.text()
-                    _LOGGER.error(
-                        "Failed to set temperature. Status: %s, Response: %s",
-                        response.status,
-                        response_text
-                    )
-        except Exception as ex:
-            _LOGGER.error("Failed to set temperature: %s", ex)
 
+        # Önce mode'u manual'e çek
+        if await self._command_queue.async_submit(
+            mode="manual", target_temperatures=new_temperatures
+        ):
+            _LOGGER.debug("Temperature set to: %s", temperature)
+        else:
+            _LOGGER.error("Failed to set temperature to %s", temperature)
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
@@ -343,34 +320,20 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
             _LOGGER.error("Invalid preset mode: %s", preset_mode)
             return
 
-
         if(preset_mode == "auto"):
-            await self._set_mode("auto")
+            success = await self._set_mode("auto")
         elif(preset_mode == "schedule"):
-            await self._set_mode("schedule")
+            success = await self._set_mode("schedule")
         else:
-            # Önce mode'u manual'e çek
-            await self._set_mode("manual")
-            # Sonra option'ı ayarla
-            session = async_get_clientsession(self.hass)
-            headers = {"authToken": self._auth_token}
-            data = {
-                "endpoint": self._device_id,
-                "option": preset_mode
-            }
-            
-            try:
-                async with session.post(
-                    f"{API_BASE_URL}{API_SET_OPTION}",
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status == 200:
-                        self._attr_preset_mode = preset_mode
-                        await self.coordinator.async_request_refresh()
-                        _LOGGER.debug("Preset mode set to: %s", preset_mode)
-            except Exception as ex:
-                _LOGGER.error("Failed to set preset mode: %s", ex)
+            # Önce mode'u manual'e çek, sonra option'ı ayarla
+            success = await self._command_queue.async_submit(
+                mode="manual", option=preset_mode
+            )
+
+        if success:
+            _LOGGER.debug("Preset mode set to: %s", preset_mode)
+        else:
+            _LOGGER.error("Failed to set preset mode: %s", preset_mode)
 
     async def async_set_hvac_mode(self, hvac_mode: str) -> None:
         """Set new hvac mode."""
@@ -386,57 +349,26 @@ class CosaThermostat(CoordinatorEntity, ClimateEntity):
             else:
                 await self._set_option(self._attr_previous_preset_mode)
 
-        # API'nin güncellenmesi için kısa bir süre bekle
-        await asyncio.sleep(1)
-        # Veriyi güncelle
-        await self.coordinator.async_refresh()
-
-    async def _set_mode(self, mode: str) -> None:
+    async def _set_mode(self, mode: str) -> bool:
         """Helper method to set the mode."""
         if mode not in self._VALID_MODES:
-            return
-            
-        session = async_get_clientsession(self.hass)
-        headers = {"authToken": self._auth_token}
-        data = {
-            "endpoint": self._device_id,
-            "mode": mode
-        }
-        
-        try:
-            async with session.post(
-                f"{API_BASE_URL}{API_SET_MODE}",
-                headers=headers,
-                json=data
-            ) as response:
-                if response.status == 200:
-                    _LOGGER.debug("Mode set to: %s", mode)
-        except Exception as ex:
-            _LOGGER.error("Failed to set mode: %s", ex) 
+            return False
 
-    
-    async def _set_option(self, option: str) -> None:
+        success = await self._command_queue.async_submit(mode=mode)
+        if success:
+            _LOGGER.debug("Mode set to: %s", mode)
+        else:
+            _LOGGER.error("Failed to set mode: %s", mode)
+        return success
+
+    async def _set_option(self, option: str) -> bool:
         """Helper method to set the option."""
         if option not in self._VALID_OPTIONS:
-            return
-            
-        session = async_get_clientsession(self.hass)
-        headers = {"authToken": self._auth_token}
-        data = {
-            "endpoint": self._device_id,
-            "option": option
-        }
-        
-        try:
-            async with session.post(
-                f"{API_BASE_URL}{API_SET_OPTION}",
-                headers=headers,
-                json=data
-            ) as response:
-                if response.status == 200:
-                    _LOGGER.debug("Option set to: %s", option)
-        except Exception as ex:
-            _LOGGER.error("Failed to set option: %s", ex) 
-
-
-   
\ No newline at end of file
+            return False
+
+        success = await self._command_queue.async_submit(option=option)
+        if success:
+            _LOGGER.debug("Option set to: %s", option)
+        else:
+            _LOGGER.error("Failed to set option: %s", option)
+        return success
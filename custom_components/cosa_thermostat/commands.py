@@ -0,0 +1,289 @@
+"""Per-device command queue for Cosa Thermostat."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    API_SET_MODE,
+    API_SET_OPTION,
+    API_SET_TARGET_TEMPERATURES,
+    MODE_AUTO,
+    MODE_SCHEDULE,
+)
+from .models import PRESET_TEMPERATURE_KEYS
+from .ratelimit import PRIORITY_COMMAND
+
+if TYPE_CHECKING:
+    from .coordinator import CosaAccountCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Slider sürüklenirken gelen ardışık komutları birleştirme süresi
+DEBOUNCE_SECONDS = 0.5
+
+# Yazılan değerin getEndpoint'te görünmesi için bekleme adımları (saniye)
+RECONCILE_DELAYS = (0.5, 1, 2, 4, 8)
+
+
+class CosaCommandQueue:
+    """Coalesce and serialize writes to a single thermostat.
+
+    Changes submitted within the debounce window are merged into one burst,
+    keeping only the last value per field. Bursts run one at a time and
+    write only what differs from the last reported device state.
+
+    Submitted changes are applied optimistically right away. Once the cloud
+    accepts the writes a background reconciler polls getEndpoint until the
+    written fields show up, and rolls the optimistic values back if they
+    never do.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: CosaAccountCoordinator,
+        device_id: str,
+    ) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._device_id = device_id
+        self._lock = asyncio.Lock()
+        self._pending: dict[str, Any] = {}
+        self._future: asyncio.Future[bool] | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._unsettled: dict[str, Any] = {}
+        self.optimistic: dict[str, Any] = {}
+
+    async def async_submit(
+        self,
+        *,
+        mode: str | None = None,
+        option: str | None = None,
+        target_temperatures: dict[str, float | None] | None = None,
+    ) -> bool:
+        """Queue changes and wait until the burst they belong to is written."""
+        changes = _changes(mode, option, target_temperatures)
+        if changes.get("mode") in (MODE_AUTO, MODE_SCHEDULE):
+            # auto/schedule modunda option yazmak modu geri değiştirebilir;
+            # seçeneği artık cihaz belirler, iyimser değer de bırakılır
+            self._pending.pop("option", None)
+            self.optimistic.pop("option", None)
+        self._pending.update(changes)
+
+        self.optimistic.update(_expected_fields(changes))
+        self._coordinator.async_update_listeners()
+
+        if self._future is None:
+            self._future = self._hass.loop.create_future()
+        future = self._future
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._hass.loop.call_later(DEBOUNCE_SECONDS, self._start_burst)
+
+        return await asyncio.shield(future)
+
+    async def async_apply(
+        self,
+        *,
+        mode: str | None = None,
+        option: str | None = None,
+        target_temperatures: dict[str, float | None] | None = None,
+    ) -> bool:
+        """Write changes right away, without debounce or reconciling.
+
+        Meant for bulk writes that confirm many devices with one refresh;
+        call async_settle once the coordinator has been refreshed.
+        """
+        changes = _changes(mode, option, target_temperatures)
+        expected = _expected_fields(changes)
+        self.optimistic.update(expected)
+        self._coordinator.async_update_listeners()
+
+        try:
+            async with self._lock:
+                result = await self._async_write(changes)
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.exception("Error writing commands for %s: %s", self._device_id, ex)
+            result = False
+
+        if not result:
+            self._async_clear_optimistic(expected)
+            return result is None
+        self._coordinator.note_activity()
+        self._unsettled.update(expected)
+        return True
+
+    @callback
+    def async_settle(self) -> None:
+        """Confirm applied writes against the last refresh.
+
+        Writes that are not reported yet are left to the background
+        reconciler.
+        """
+        expected, self._unsettled = self._unsettled, {}
+        if not expected:
+            return
+        endpoint = self._coordinator.reported_endpoint(self._device_id) or {}
+        if all(endpoint.get(key) == value for key, value in expected.items()):
+            self._async_clear_optimistic(expected)
+            return
+        self._hass.async_create_background_task(
+            self._async_reconcile(expected),
+            f"{self._device_id} reconcile",
+        )
+
+    @callback
+    def _start_burst(self) -> None:
+        """Hand the pending changes over to a flush task."""
+        changes, future = self._pending, self._future
+        self._pending, self._future, self._timer = {}, None, None
+        if future is None:
+            return
+        self._hass.async_create_task(self._async_flush(changes, future))
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop pending changes that have not been written yet."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._future is not None and not self._future.done():
+            self._future.set_result(False)
+        self._pending, self._future = {}, None
+        self.optimistic.clear()
+
+    async def _async_flush(
+        self, changes: dict[str, Any], future: asyncio.Future[bool]
+    ) -> None:
+        """Write a burst of changes and start reconciling it."""
+        expected = _expected_fields(changes)
+        try:
+            async with self._lock:
+                result = await self._async_write(changes)
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.exception("Error writing commands for %s: %s", self._device_id, ex)
+            result = False
+
+        if not future.done():
+            future.set_result(result is not False)
+
+        if result is None:
+            self._async_clear_optimistic(expected)
+        elif not result:
+            _LOGGER.error("Rolling back rejected changes for %s", self._device_id)
+            self._async_clear_optimistic(expected)
+        else:
+            self._coordinator.note_activity()
+            self._hass.async_create_background_task(
+                self._async_reconcile(expected),
+                f"{self._device_id} reconcile",
+            )
+
+    async def _async_write(self, changes: dict[str, Any]) -> bool | None:
+        """Post the changes that differ from the device state.
+
+        Returns None when there was nothing to write.
+        """
+        endpoint = self._coordinator.reported_endpoint(self._device_id) or {}
+        writes: list[tuple[str, dict[str, Any]]] = []
+
+        mode = changes.get("mode")
+        if mode is not None and endpoint.get("mode") != mode:
+            writes.append((API_SET_MODE, {"mode": mode}))
+
+        option = changes.get("option")
+        if option is not None and endpoint.get("option") != option:
+            writes.append((API_SET_OPTION, {"option": option}))
+
+        temperatures = changes.get("targetTemperatures")
+        if temperatures is not None and any(
+            endpoint.get(key) != temperatures.get(option_name)
+            for option_name, key in PRESET_TEMPERATURE_KEYS.items()
+        ):
+            writes.append(
+                (API_SET_TARGET_TEMPERATURES, {"targetTemperatures": temperatures})
+            )
+
+        if not writes:
+            _LOGGER.debug("No changes to write for %s", self._device_id)
+            return None
+
+        for path, data in writes:
+            if not await self._coordinator.async_post(
+                path, {"endpoint": self._device_id, **data}
+            ):
+                return False
+
+        return True
+
+    async def _async_reconcile(self, expected: dict[str, Any]) -> None:
+        """Poll getEndpoint until the written fields are reported."""
+        endpoint: dict[str, Any] | None = None
+        sequence = 0
+        for delay in RECONCILE_DELAYS:
+            await asyncio.sleep(delay)
+            try:
+                endpoint, sequence = await self._coordinator.async_fetch_endpoint(
+                    self._device_id, PRIORITY_COMMAND
+                )
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.debug("Reconcile fetch failed for %s: %s", self._device_id, ex)
+                continue
+
+            if all(endpoint.get(key) == value for key, value in expected.items()):
+                _LOGGER.debug("Changes confirmed for %s", self._device_id)
+                break
+        else:
+            _LOGGER.error(
+                "Changes for %s were not confirmed by the API, rolling back: %s",
+                self._device_id,
+                expected,
+            )
+
+        if endpoint is not None:
+            self._coordinator.async_set_endpoint(self._device_id, endpoint, sequence)
+        self._async_clear_optimistic(expected)
+
+    @callback
+    def _async_clear_optimistic(self, expected: dict[str, Any]) -> None:
+        """Drop optimistic values unless a newer burst replaced them."""
+        for key, value in expected.items():
+            if self.optimistic.get(key) == value:
+                del self.optimistic[key]
+        self._coordinator.async_update_listeners()
+
+
+def _changes(
+    mode: str | None,
+    option: str | None,
+    target_temperatures: dict[str, float | None] | None,
+) -> dict[str, Any]:
+    """Return the submitted changes keyed by API field."""
+    changes: dict[str, Any] = {}
+    if mode is not None:
+        changes["mode"] = mode
+    if option is not None:
+        changes["option"] = option
+    if target_temperatures is not None:
+        changes["targetTemperatures"] = target_temperatures
+    return changes
+
+
+def _expected_fields(changes: dict[str, Any]) -> dict[str, Any]:
+    """Map queued changes to the endpoint fields they should produce."""
+    fields: dict[str, Any] = {}
+    if (mode := changes.get("mode")) is not None:
+        fields["mode"] = mode
+    if (option := changes.get("option")) is not None:
+        fields["option"] = option
+    if (temperatures := changes.get("targetTemperatures")) is not None:
+        for option_name, key in PRESET_TEMPERATURE_KEYS.items():
+            if temperatures.get(option_name) is not None:
+                fields[key] = temperatures[option_name]
+    return fields
@@ -1,21 +1,62 @@
 """Config flow for Cosa Thermostat integration."""
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
+from typing import Any
+
 import voluptuous as vol
 import aiohttp
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_DEVICE_ID
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_DEVICE_ID, CONF_DEVICES
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, API_BASE_URL, API_LOGIN, API_GET_ENDPOINTS
+from .api import CosaApiClient, CosaApiError, CosaAuthError
+from .const import (
+    DOMAIN,
+    API_BASE_URL,
+    CONF_API_BASE_URL,
+    CONF_FAST_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_FAST_WINDOW,
+    CONF_STALE_GRACE,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_PUBLISH_INTERVAL,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_FAST_WINDOW,
+    DEFAULT_STALE_GRACE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_PUBLISH_INTERVAL,
+)
+from .metrics import get_metrics
+from .ratelimit import PRIORITY_COMMAND, get_rate_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _base_url(user_input: dict[str, Any]) -> str:
+    """Return the API base URL entered in the advanced user step."""
+    url = user_input.get(CONF_API_BASE_URL, API_BASE_URL).strip().rstrip("/")
+    try:
+        return cv.url(url)
+    except vol.Invalid as err:
+        raise InvalidUrl from err
+
+
+def _entry_title(device: dict[str, Any]) -> str:
+    """Return the config entry title of a device."""
+    return f"Cosa Thermostat - {device.get('name') or device['id']}"
+
 class CosaThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Cosa Thermostat."""
 
@@ -27,6 +68,15 @@ class CosaThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._email = None
         self._password = None
         self._devices = None
+        self._base_url = API_BASE_URL
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> CosaThermostatOptionsFlow:
+        """Get the options flow for this handler."""
+        return CosaThermostatOptionsFlow(config_entry)
 
     async def async_step_user(
         self, user_input: dict[str, str] | None = None
@@ -38,6 +88,7 @@ class CosaThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             try:
                 self._email = user_input[CONF_EMAIL]
                 self._password = user_input[CONF_PASSWORD]
+                self._base_url = _base_url(user_input)
                 self._auth_token = await self._validate_login(self._email, self._password)
                 self._devices = await self._get_devices()
                 
@@ -47,6 +98,8 @@ class CosaThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 else:
                     errors["base"] = "no_devices"
                     
+            except InvalidUrl:
+                errors[CONF_API_BASE_URL] = "invalid_url"
             except InvalidAuth:
                 errors["base"] = "invalid_auth"
             except CannotConnect:
@@ -55,93 +108,254 @@ class CosaThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
 
+        schema = {
+            vol.Required(CONF_EMAIL): str,
+            vol.Required(CONF_PASSWORD): str,
+        }
+        # Gelişmiş modda yerel mock sunucu veya relay gösterilebilir
+        if self.show_advanced_options:
+            schema[vol.Optional(CONF_API_BASE_URL, default=API_BASE_URL)] = str
+
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema({
-                vol.Required(CONF_EMAIL): str,
-                vol.Required(CONF_PASSWORD): str,
-            }),
+            data_schema=vol.Schema(schema),
             errors=errors,
         )
 
     async def async_step_select_device(
-        self, user_input: dict[str, str] | None = None
+        self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle device selection."""
+        """Handle device selection.
+
+        Every selected thermostat gets its own entry from this single login;
+        the first one is created by this flow and the rest through import
+        flows that reuse the device list fetched above.
+        """
         errors = {}
 
+        configured = {
+            entry.data.get(CONF_DEVICE_ID) for entry in self._async_current_entries()
+        }
+        available = [d for d in self._devices if d["id"] not in configured]
+        if not available:
+            return self.async_abort(reason="already_configured")
+
         if user_input is not None:
-            device_id = user_input[CONF_DEVICE_ID]
-            device = next((d for d in self._devices if d["id"] == device_id), None)
-            
-            if device:
+            selected = [d for d in available if d["id"] in user_input[CONF_DEVICES]]
+            if selected:
+                for device in selected[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data=self._entry_data(device),
+                        )
+                    )
                 return self.async_create_entry(
-                    title=f"Cosa Thermostat - {device.get('name', device_id)}",
-                    data={
-                        CONF_EMAIL: self._email,
-                        CONF_PASSWORD: self._password,
-                        CONF_DEVICE_ID: device_id,
-                        "device_name": device.get("name", ""),
-                        "auth_token": self._auth_token
-                    },
+                    title=_entry_title(selected[0]),
+                    data=self._entry_data(selected[0]),
                 )
+            errors["base"] = "no_devices_selected"
 
         # Cihaz listesini oluştur
         devices = {
             device["id"]: f"{device.get('name', '')} ({device['id']})"
-            for device in self._devices
+            for device in available
         }
 
         return self.async_show_form(
             step_id="select_device",
             data_schema=vol.Schema({
-                vol.Required(CONF_DEVICE_ID): vol.In(devices)
+                vol.Required(CONF_DEVICES, default=list(devices)): cv.multi_select(
+                    devices
+                )
+            }),
+            errors=errors,
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a device selected in another flow."""
+        device_id = import_data[CONF_DEVICE_ID]
+        for entry in self._async_current_entries():
+            if entry.data.get(CONF_DEVICE_ID) == device_id:
+                return self.async_abort(reason="already_configured")
+
+        return self.async_create_entry(
+            title=_entry_title(
+                {"id": device_id, "name": import_data.get("device_name")}
+            ),
+            data=import_data,
+        )
+
+    def _entry_data(self, device: dict[str, Any]) -> dict[str, Any]:
+        """Return the config entry data of a device."""
+        data = {
+            CONF_EMAIL: self._email,
+            CONF_PASSWORD: self._password,
+            CONF_DEVICE_ID: device["id"],
+            "device_name": device.get("name", ""),
+            "auth_token": self._auth_token,
+        }
+        if self._base_url != API_BASE_URL:
+            data[CONF_API_BASE_URL] = self._base_url
+        return data
+
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> FlowResult:
+        """Handle rejected credentials."""
+        self._email = entry_data[CONF_EMAIL]
+        self._base_url = entry_data.get(CONF_API_BASE_URL, API_BASE_URL)
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, str] | None = None
+    ) -> FlowResult:
+        """Ask for the new password of the account."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                auth_token = await self._validate_login(
+                    self._email, user_input[CONF_PASSWORD]
+                )
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except Exception:
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                # Aynı hesaptaki tüm cihazların bilgilerini güncelle
+                for entry in self._async_current_entries():
+                    if entry.data.get(CONF_EMAIL) != self._email:
+                        continue
+                    self.hass.config_entries.async_update_entry(
+                        entry,
+                        data={
+                            **entry.data,
+                            CONF_PASSWORD: user_input[CONF_PASSWORD],
+                            "auth_token": auth_token,
+                        },
+                    )
+                    self.hass.async_create_task(
+                        self.hass.config_entries.async_reload(entry.entry_id)
+                    )
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({
+                vol.Required(CONF_PASSWORD): str,
             }),
+            description_placeholders={"email": self._email},
             errors=errors,
         )
 
     async def _validate_login(self, email: str, password: str) -> str:
         """Validate login credentials and return auth token."""
-        session = async_get_clientsession(self.hass)
-        
+        client = CosaApiClient(
+            async_get_clientsession(self.hass),
+            self._base_url,
+            on_request=get_metrics(self.hass, email).record_request,
+        )
         try:
-            async with session.post(
-                f"{API_BASE_URL}{API_LOGIN}",
-                json={"email": email, "password": password}
-            ) as response:
-                if response.status != 200:
-                    raise InvalidAuth
-                
-                response_data = await response.json()
-                if "authToken" not in response_data:
-                    raise InvalidAuth
-                
-                return response_data["authToken"]
-                
-        except aiohttp.ClientError as ex:
+            response_data = await client.async_login(email, password)
+        except CosaAuthError as ex:
+            raise InvalidAuth from ex
+        except (CosaApiError, aiohttp.ClientError, TimeoutError) as ex:
             raise CannotConnect from ex
+        return response_data["authToken"]
 
     async def _get_devices(self) -> list:
         """Get list of devices."""
-        session = async_get_clientsession(self.hass)
-        headers = {"authToken": self._auth_token}
-        
+        client = CosaApiClient(
+            async_get_clientsession(self.hass),
+            self._base_url,
+            on_request=get_metrics(self.hass, self._email).record_request,
+            throttle=get_rate_limiter(self.hass, self._email).async_acquire,
+        )
         try:
-            async with session.get(
-                f"{API_BASE_URL}{API_GET_ENDPOINTS}",
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    raise CannotConnect
-                
-                response_data = await response.json()
-                return response_data.get("endpoints", [])
-                
-        except aiohttp.ClientError as ex:
+            response_data = await client.async_get_endpoints(
+                self._auth_token, PRIORITY_COMMAND
+            )
+        except (CosaApiError, aiohttp.ClientError, TimeoutError) as ex:
             raise CannotConnect from ex
+        return response_data.get("endpoints", [])
+
+class CosaThermostatOptionsFlow(config_entries.OptionsFlow):
+    """Handle Cosa Thermostat options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, float] | None = None
+    ) -> FlowResult:
+        """Manage the polling and outage options."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_SLOW_INTERVAL] < user_input[CONF_FAST_INTERVAL]:
+                errors["base"] = "invalid_intervals"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_FAST_INTERVAL,
+                    default=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                vol.Required(
+                    CONF_SLOW_INTERVAL,
+                    default=options.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=1800)),
+                vol.Required(
+                    CONF_FAST_WINDOW,
+                    default=options.get(CONF_FAST_WINDOW, DEFAULT_FAST_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                vol.Required(
+                    CONF_STALE_GRACE,
+                    default=options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Required(
+                    CONF_REQUESTS_PER_MINUTE,
+                    default=options.get(
+                        CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                vol.Required(
+                    CONF_TEMPERATURE_DEADBAND,
+                    default=options.get(
+                        CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Required(
+                    CONF_HUMIDITY_DEADBAND,
+                    default=options.get(
+                        CONF_HUMIDITY_DEADBAND, DEFAULT_HUMIDITY_DEADBAND
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=20)),
+                vol.Required(
+                    CONF_PUBLISH_INTERVAL,
+                    default=options.get(
+                        CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            }),
+            errors=errors,
+        )
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
+class InvalidUrl(HomeAssistantError):
+    """Error to indicate the API base URL is not a valid URL."""
+
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth.""" 
\ No newline at end of file
@@ -1,6 +1,18 @@
 """Constants for the Cosa Thermostat integration."""
 from homeassistant.const import Platform
 
+from .protocol import (  # noqa: F401
+    API_BASE_URL,
+    API_LOGIN,
+    API_GET_ENDPOINTS,
+    API_GET_ENDPOINT,
+    API_GET_TELEMETRIES,
+    API_SET_TARGET_TEMPERATURES,
+    API_SET_MODE,
+    API_SET_OPTION,
+    API_SET_OPERATION_MODE,
+)
+
 DOMAIN = "cosa_thermostat"
 PLATFORMS = [Platform.CLIMATE]
 
@@ -8,17 +20,47 @@ PLATFORMS = [Platform.CLIMATE]
 CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
 CONF_DEVICE_ID = "device_id"
+CONF_API_BASE_URL = "api_base_url"
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_SLOW_INTERVAL = "slow_interval"
+CONF_FAST_WINDOW = "fast_window"
+CONF_STALE_GRACE = "stale_grace"
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_HUMIDITY_DEADBAND = "humidity_deadband"
+CONF_PUBLISH_INTERVAL = "publish_interval"
+
+# Polling (saniye)
+DEFAULT_FAST_INTERVAL = 10
+DEFAULT_SLOW_INTERVAL = 180
+DEFAULT_FAST_WINDOW = 60
+# Kesinti sırasında son verinin gösterilmeye devam edeceği süre
+DEFAULT_STALE_GRACE = 600
+# Hesap başına dakikada en fazla istek
+DEFAULT_REQUESTS_PER_MINUTE = 60
+# Bu eşiklerin altındaki ölçüm değişimleri ancak aralık dolunca yazılır
+DEFAULT_TEMPERATURE_DEADBAND = 0.1
+DEFAULT_HUMIDITY_DEADBAND = 1.0
+DEFAULT_PUBLISH_INTERVAL = 300
+
+# getEndpoints cevabında bu alanlar yoksa getEndpoint ile tamamlanır
+REQUIRED_ENDPOINT_FIELDS = (
+    "temperature",
+    "humidity",
+    "option",
+    "mode",
+    "combiState",
+    "operationMode",
+)
 
-# API Constants
-API_BASE_URL = "https://kiwi.cosa.com.tr"
-API_LOGIN = "/api/users/login"
-API_GET_ENDPOINTS = "/api/endpoints/getEndpoints/"
-API_GET_ENDPOINT = "/api/endpoints/getEndpoint"
-API_GET_TELEMETRIES = "/api/endpoints/getTelemetries"
-API_SET_TARGET_TEMPERATURES = "/api/endpoints/setTargetTemperatures"
-API_SET_MODE = "/api/endpoints/setMode"
-API_SET_OPTION = "/api/endpoints/setOption"
-API_SET_OPERATION_MODE = "/api/endpoints/setOperationMode"
+# hass.data anahtarları
+DATA_ACCOUNTS = "accounts"
+DATA_METRICS = "metrics"
+DATA_RATE_LIMITERS = "rate_limiters"
+DATA_RUNTIME = "runtime"
+DATA_THERMAL = "thermal"
+DATA_PROFILER = "profiler"
+DATA_EXPORTS = "exports"
 
 # Operation Modes
 MODE_AUTO = "auto"
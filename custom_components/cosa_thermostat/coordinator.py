@@ -0,0 +1,845 @@
+"""Account level data coordinator for Cosa Thermostat."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import hashlib
+import itertools
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_point_in_utc_time,
+)
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    DOMAIN,
+    API_BASE_URL,
+    API_GET_ENDPOINT,
+    API_GET_ENDPOINTS,
+    API_GET_TELEMETRIES,
+    REQUIRED_ENDPOINT_FIELDS,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_FAST_WINDOW,
+    DEFAULT_STALE_GRACE,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_HUMIDITY_DEADBAND,
+    DEFAULT_PUBLISH_INTERVAL,
+    MODE_SCHEDULE,
+)
+from .api import CosaApiClient, CosaApiError
+from .auth import CosaAuth
+from .breaker import CosaCircuitBreaker
+from .commands import CosaCommandQueue
+from .deadband import CosaDeadband
+from .metrics import get_metrics
+from .models import CosaSnapshot
+from .ratelimit import PRIORITY_COMMAND, PRIORITY_POLL, get_rate_limiter
+from .runtime import CosaRuntimeTracker, get_runtime_tracker
+from .schedule import CosaSchedule
+from .thermal import CosaThermalModel, get_thermal_model
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bu alanlar değişmediği sürece polling yavaşlatılır
+_ACTIVITY_FIELDS = ("temperature", "option", "mode")
+
+# Aynı anda en fazla bu kadar tek cihaz sorgusu gönderilir
+MAX_PARALLEL_FETCHES = 8
+
+# Push alınırken polling bu aralıkta bir kontrole düşer (saniye)
+PUSH_HEARTBEAT_INTERVAL = 600
+# Son push'tan bu kadar sonra normal polling'e dönülür (saniye)
+PUSH_TIMEOUT = 900
+
+# Tahmin edilen program geçişinden bu kadar sonra yenilenir
+TRANSITION_REFRESH_DELAY = timedelta(seconds=15)
+
+SNAPSHOT_STORAGE_VERSION = 1
+# Son durum her poll'da değil, en fazla bu aralıkla diske yazılır
+SNAPSHOT_SAVE_DELAY = 60
+
+
+def snapshot_store(hass: HomeAssistant, device_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the last known endpoint of a device."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{device_id}")
+
+
+class CosaAccountCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Poll every thermostat of an account with a single getEndpoints call."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        auth: CosaAuth,
+        base_url: str = API_BASE_URL,
+    ) -> None:
+        """Initialize the coordinator.
+
+        The coordinator is shared by every entry of the account, so it is
+        bound to none of them; async_setup_entry and async_unload_entry
+        manage its lifetime through the account's device set, and CosaAuth
+        starts reauth on every entry of the account.
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=None,
+            name=f"Cosa Thermostat {auth.email}",
+            update_interval=timedelta(seconds=DEFAULT_FAST_INTERVAL),
+            always_update=False,
+        )
+        self.auth = auth
+        self.metrics = get_metrics(hass, auth.email)
+        self.limiter = get_rate_limiter(hass, auth.email)
+        self._rate_limits: dict[str, float] = {}
+        self.email = auth.email
+        self.base_url = base_url
+        self.client = CosaApiClient(
+            async_get_clientsession(hass),
+            base_url,
+            on_request=self.metrics.record_request,
+            throttle=self.limiter.async_acquire,
+        )
+        self._device_ids: set[str] = set()
+        self.command_queues: dict[str, CosaCommandQueue] = {}
+        self._snapshots: dict[str, CosaSnapshot] = {}
+        self._poll_settings: dict[str, tuple[float, float, float]] = {}
+        self._fast_until = 0.0
+        self.breaker = CosaCircuitBreaker(f"Cosa cloud for {auth.email}")
+        self.stale_since: datetime | None = None
+        self._last_success = time.monotonic()
+        self._stale_grace: dict[str, float] = {}
+        self._unsub_stale_expiry: Callable[[], None] | None = None
+        self._publish_limits: dict[str, tuple[float, float, float]] = {}
+        self._response_cache: dict[str, _CachedResponse] = {}
+        self._endpoints_source: dict[str, Any] | None = None
+        self._endpoints: dict[str, dict[str, Any]] = {}
+        self._setup_refresh: asyncio.Task[None] | None = None
+        self._last_push: float | None = None
+        self._snapshot_stores: dict[str, Store[dict[str, Any]]] = {}
+        self._schedules: dict[str, tuple[Any, CosaSchedule | None]] = {}
+        self.runtime: dict[str, CosaRuntimeTracker] = {}
+        self.thermal: dict[str, CosaThermalModel] = {}
+        self._transition_at: datetime | None = None
+        self._unsub_transition: Callable[[], None] | None = None
+        # Her istek gönderilirken artan bir sıra numarası alır
+        self._sequence = itertools.count(1)
+        self._device_sequence: dict[str, int] = {}
+
+    @property
+    def device_ids(self) -> set[str]:
+        """Return the device ids tracked by this coordinator."""
+        return self._device_ids
+
+    def add_device(self, device_id: str) -> None:
+        """Start tracking a device."""
+        self._device_ids.add(device_id)
+        if device_id not in self._snapshot_stores:
+            self._snapshot_stores[device_id] = snapshot_store(self.hass, device_id)
+        if device_id not in self.runtime:
+            self.runtime[device_id] = get_runtime_tracker(self.hass, device_id)
+        if device_id not in self.thermal:
+            self.thermal[device_id] = get_thermal_model(self.hass, device_id)
+        if device_id not in self.command_queues:
+            self.command_queues[device_id] = CosaCommandQueue(self.hass, self, device_id)
+        # Hesabın verisi zaten varsa (entry yeniden yüklendi) durumu hemen kur
+        if (endpoint := self.endpoint(device_id)) is not None:
+            self._snapshots[device_id] = CosaSnapshot(endpoint)
+
+    def remove_device(self, device_id: str) -> None:
+        """Stop tracking a device."""
+        self._device_ids.discard(device_id)
+        self._snapshots.pop(device_id, None)
+        self._snapshot_stores.pop(device_id, None)
+        self._schedules.pop(device_id, None)
+        self.runtime.pop(device_id, None)
+        self.thermal.pop(device_id, None)
+        if queue := self.command_queues.pop(device_id, None):
+            queue.async_cancel()
+        self._poll_settings.pop(device_id, None)
+        self._stale_grace.pop(device_id, None)
+        self._publish_limits.pop(device_id, None)
+        self._rate_limits.pop(device_id, None)
+        self._device_sequence.pop(device_id, None)
+
+    def set_poll_intervals(
+        self,
+        device_id: str,
+        fast_interval: float = DEFAULT_FAST_INTERVAL,
+        slow_interval: float = DEFAULT_SLOW_INTERVAL,
+        fast_window: float = DEFAULT_FAST_WINDOW,
+    ) -> None:
+        """Set the polling bounds requested by a device's options."""
+        self._poll_settings[device_id] = (
+            fast_interval,
+            max(slow_interval, fast_interval),
+            fast_window,
+        )
+
+    @property
+    def _poll_bounds(self) -> tuple[float, float, float]:
+        """Return the effective fast interval, slow interval and fast window.
+
+        The account is polled once for every device, so the most demanding
+        settings of all attached entries win.
+        """
+        if not self._poll_settings:
+            return DEFAULT_FAST_INTERVAL, DEFAULT_SLOW_INTERVAL, DEFAULT_FAST_WINDOW
+        settings = self._poll_settings.values()
+        return (
+            min(fast for fast, _, _ in settings),
+            min(slow for _, slow, _ in settings),
+            max(window for _, _, window in settings),
+        )
+
+    def note_activity(self) -> None:
+        """Switch to fast polling after a command or a heating transition.
+
+        Setting update_interval does not move a refresh that is already
+        scheduled, so a poll still due at the slow interval is rescheduled
+        to the fast one.
+        """
+        fast_interval, _, fast_window = self._poll_bounds
+        self._fast_until = time.monotonic() + fast_window
+        if self.push_active:
+            return
+        interval = timedelta(seconds=fast_interval)
+        shrinks = self.update_interval is None or interval < self.update_interval
+        self.update_interval = interval
+        if shrinks and self._listeners:
+            self._schedule_refresh()
+
+    @property
+    def push_active(self) -> bool:
+        """Return True while state pushes keep arriving."""
+        return (
+            self._last_push is not None
+            and time.monotonic() - self._last_push < PUSH_TIMEOUT
+        )
+
+    def _adapt_update_interval(
+        self,
+        previous: dict[str, dict[str, Any]] | None,
+        current: dict[str, dict[str, Any]],
+    ) -> None:
+        """Poll fast around activity and back off while nothing changes."""
+        fast_interval, slow_interval, _ = self._poll_bounds
+        changed = previous is None
+
+        for device_id, endpoint in current.items():
+            old = (previous or {}).get(device_id)
+            if old is None:
+                changed = True
+                continue
+            if old.get("combiState") != endpoint.get("combiState"):
+                self.note_activity()
+            if any(old.get(field) != endpoint.get(field) for field in _ACTIVITY_FIELDS):
+                changed = True
+
+        if self.push_active:
+            # Durum push ile geliyor, polling sadece kaçanları yakalar
+            interval = max(slow_interval, PUSH_HEARTBEAT_INTERVAL)
+        elif changed or time.monotonic() < self._fast_until:
+            interval = fast_interval
+        else:
+            # Değişiklik yoksa aralığı adım adım iki katına çıkar
+            current_interval = (self.update_interval or timedelta()).total_seconds()
+            interval = min(max(current_interval, fast_interval) * 2, slow_interval)
+
+        if self.update_interval != timedelta(seconds=interval):
+            _LOGGER.debug("Polling %s every %s seconds", self.email, interval)
+            self.update_interval = timedelta(seconds=interval)
+
+    def endpoint(self, device_id: str) -> dict[str, Any] | None:
+        """Return the endpoint payload of a device with pending writes applied."""
+        endpoint = self.reported_endpoint(device_id)
+        queue = self.command_queues.get(device_id)
+        if endpoint is None or queue is None or not queue.optimistic:
+            return endpoint
+        return {**endpoint, **queue.optimistic}
+
+    def snapshot(self, device_id: str) -> CosaSnapshot | None:
+        """Return the parsed state of a device."""
+        return self._snapshots.get(device_id)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Parse every endpoint once, then notify the entities."""
+        self._snapshots = {
+            device_id: CosaSnapshot(endpoint)
+            for device_id in self._device_ids
+            if (endpoint := self.endpoint(device_id)) is not None
+        }
+        # Diskten yüklenen eski durum sayaçlara işlenmez
+        if self.stale_since is None:
+            for device_id, snapshot in self._snapshots.items():
+                if tracker := self.runtime.get(device_id):
+                    tracker.update(snapshot.heating)
+        self._async_update_schedules()
+        super().async_update_listeners()
+
+    def schedule(self, device_id: str) -> CosaSchedule | None:
+        """Return the cached weekly schedule of a device."""
+        cached = self._schedules.get(device_id)
+        return cached[1] if cached else None
+
+    def next_transition(self, device_id: str) -> tuple[datetime, str] | None:
+        """Return when and to which option a device on schedule switches next."""
+        snapshot = self.snapshot(device_id)
+        schedule = self.schedule(device_id)
+        if snapshot is None or schedule is None or snapshot.mode != MODE_SCHEDULE:
+            return None
+        return schedule.next_transition(dt_util.now())
+
+    @callback
+    def _async_update_schedules(self) -> None:
+        """Parse changed schedules and refresh right after the next transition.
+
+        The parsed schedule is reused until the payload changes, so neither
+        the index nor the next transition costs a request.
+        """
+        for device_id in self._device_ids:
+            raw = (self.reported_endpoint(device_id) or {}).get("schedule")
+            cached = self._schedules.get(device_id)
+            if cached is None or cached[0] != raw:
+                self._schedules[device_id] = (raw, CosaSchedule.from_payload(raw))
+                if raw is None:
+                    _LOGGER.debug(
+                        "No schedule in the payload of %s, transitions are not "
+                        "predicted",
+                        device_id,
+                    )
+
+        transitions = [
+            transition[0]
+            for device_id in self._device_ids
+            if (transition := self.next_transition(device_id)) is not None
+        ]
+        when = (
+            dt_util.as_utc(min(transitions)) + TRANSITION_REFRESH_DELAY
+            if transitions
+            else None
+        )
+        if when == self._transition_at:
+            return
+
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+        self._transition_at = when
+        if when is not None:
+            _LOGGER.debug("Next schedule transition of %s at %s", self.email, when)
+            self._unsub_transition = async_track_point_in_utc_time(
+                self.hass, self._async_handle_transition, when
+            )
+
+    async def _async_handle_transition(self, now: datetime) -> None:
+        """Refresh once a predicted schedule transition has happened."""
+        self._unsub_transition = None
+        self._transition_at = None
+        self.note_activity()
+        await self.async_request_refresh()
+        # Cevap değişmediyse listener'lar çağrılmaz, sonraki geçişi yine kur
+        self._async_update_schedules()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the transition and stale timers, then shut down."""
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+        if self._unsub_stale_expiry is not None:
+            self._unsub_stale_expiry()
+            self._unsub_stale_expiry = None
+        await super().async_shutdown()
+
+    def device_name(self, device_id: str) -> str:
+        """Return the name of a device as reported by the API."""
+        endpoint = self.reported_endpoint(device_id) or {}
+        return endpoint.get("name") or f"Cosa Thermostat {device_id}"
+
+    def reported_endpoint(self, device_id: str) -> dict[str, Any] | None:
+        """Return the last endpoint payload reported by the API."""
+        if not self.data:
+            return None
+        return self.data.get(device_id)
+
+    def _is_current(self, device_id: str, sequence: int) -> bool:
+        """Return whether a response is newer than the state it would replace.
+
+        A command raises the bar of its device, so a poll sent before the
+        write can never roll its result back.
+        """
+        if sequence < self._device_sequence.get(device_id, 0):
+            _LOGGER.debug(
+                "Discarding stale result #%s for %s (current #%s)",
+                sequence,
+                device_id,
+                self._device_sequence[device_id],
+            )
+            self.metrics.record_stale_result()
+            return False
+        self._device_sequence[device_id] = sequence
+        return True
+
+    @callback
+    def async_set_endpoint(
+        self, device_id: str, endpoint: dict[str, Any], sequence: int
+    ) -> None:
+        """Store a freshly fetched endpoint payload without a full poll."""
+        if self.data is None or device_id not in self._device_ids:
+            return
+        if not self._is_current(device_id, sequence):
+            return
+        reported = self.data.get(device_id, {})
+        self.data = {**self.data, device_id: {**reported, **endpoint}}
+        self.async_update_listeners()
+
+    @callback
+    def async_push_endpoint(self, device_id: str, endpoint: dict[str, Any]) -> bool:
+        """Apply an endpoint state pushed by the cloud or a relay.
+
+        Returns False when the push is for an unknown device or every field
+        already matches the reported state.
+        """
+        if self.data is None or device_id not in self._device_ids:
+            return False
+        self._last_push = time.monotonic()
+
+        reported = self.data.get(device_id, {})
+        if all(reported.get(key) == value for key, value in endpoint.items()):
+            return False
+        # Push'un isteği yok, geldiği an sırası alınır
+        self._is_current(device_id, next(self._sequence))
+
+        previous = self.data
+        data = {**previous, device_id: {**reported, **endpoint}}
+        self._adapt_update_interval(previous, data)
+        self._async_save_snapshots(previous, data)
+        # Bir sonraki poll heartbeat aralığı kadar ertelenir
+        self.async_set_updated_data(data)
+        return True
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Fetch all endpoints unless the circuit breaker holds polls back."""
+        if not self.breaker.allow_request():
+            self._async_schedule_stale_expiry()
+            self.update_interval = timedelta(seconds=max(self.breaker.retry_in, 1))
+            raise UpdateFailed(
+                f"Cosa cloud unavailable, retrying in {self.breaker.retry_in:.0f}s"
+            )
+
+        try:
+            data = await self._async_fetch_all()
+        except ConfigEntryAuthFailed:
+            raise
+        except Exception as err:
+            # Kesinti sırasında log'u doldurmamak için ayrıntı debug seviyesinde
+            _LOGGER.debug("Error updating data: %s", err, exc_info=True)
+            self.breaker.record_failure()
+            if self.stale_since is None:
+                self.stale_since = dt_util.utcnow()
+            self._async_schedule_stale_expiry()
+            if self.breaker.retry_in:
+                self.update_interval = timedelta(seconds=self.breaker.retry_in)
+            if isinstance(err, UpdateFailed):
+                raise
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        recovered = self.breaker.record_success()
+        if self._unsub_stale_expiry is not None:
+            self._unsub_stale_expiry()
+            self._unsub_stale_expiry = None
+        was_stale = self.stale_since is not None
+        self.stale_since = None
+        self._last_success = time.monotonic()
+        self._adapt_update_interval(None if recovered else self.data, data)
+        self._async_save_snapshots(self.data, data)
+        # Canlı veri diskten yüklenenle aynıysa listener'lar çağrılmaz;
+        # stale işaretini kaldırmak ve sayaçları beslemek için burada çağır
+        if was_stale and self.last_update_success and data == self.data:
+            self.async_update_listeners()
+        return data
+
+    async def _async_fetch_all(self) -> dict[str, dict[str, Any]]:
+        """Fetch all endpoints and fan them out per device."""
+        endpoints, changed, sequence = await self._async_fetch_endpoints()
+        previous = self.data or {}
+
+        data: dict[str, dict[str, Any]] = {}
+        missing: list[str] = []
+        discarded = False
+        for device_id in self._device_ids:
+            endpoint = endpoints.get(device_id)
+            # Toplu cevapta eksik alan varsa tek cihaz sorgusuna düş
+            if endpoint is None or not all(
+                field in endpoint for field in REQUIRED_ENDPOINT_FIELDS
+            ):
+                missing.append(device_id)
+            elif device_id in previous and not self._is_current(device_id, sequence):
+                # Poll sürerken komut yazıldı, önceki durum korunur
+                data[device_id] = previous[device_id]
+                changed = discarded = True
+            else:
+                data[device_id] = endpoint
+
+        if discarded:
+            # Atılan cevap kaynak olarak tutulmaz; sonraki poll aynı gövdeyi
+            # döndürürse yine uygulanır
+            self._endpoints_source = None
+            self._response_cache.pop(API_GET_ENDPOINTS, None)
+
+        # Cevap aynıysa aynı nesneyi döndür, listener'lar tetiklenmez
+        if (
+            not changed
+            and not missing
+            and self.data is not None
+            and self.data.keys() == data.keys()
+        ):
+            return self.data
+
+        if missing:
+            _LOGGER.debug("Falling back to getEndpoint for %s", missing)
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_FETCHES)
+
+            async def _async_fetch(device_id: str) -> tuple[dict[str, Any], int]:
+                async with semaphore:
+                    return await self.async_fetch_endpoint(device_id)
+
+            results = await asyncio.gather(
+                *(_async_fetch(device_id) for device_id in missing)
+            )
+            for device_id, (endpoint, device_sequence) in zip(missing, results):
+                if device_id in previous and not self._is_current(
+                    device_id, device_sequence
+                ):
+                    data[device_id] = previous[device_id]
+                    continue
+                partial = endpoints.get(device_id, {})
+                data[device_id] = {**partial, **endpoint}
+
+        return data
+
+    async def async_refresh_device(self, device_id: str) -> bool:
+        """Fetch the first state of a newly added device.
+
+        Entries of the same account set up at once share one in-flight
+        refresh instead of polling the account once each. Returns whether
+        the device has data afterwards.
+        """
+        while self.reported_endpoint(device_id) is None:
+            if self._setup_refresh is None:
+                self._setup_refresh = self.hass.async_create_task(
+                    self._async_setup_refresh()
+                )
+            await asyncio.shield(self._setup_refresh)
+            if not self.last_update_success:
+                return False
+        return True
+
+    async def async_restore_device(self, device_id: str) -> bool:
+        """Load the last known endpoint of a device from disk.
+
+        The restored state is shown as stale until the next successful poll.
+        Returns whether a saved state was found.
+        """
+        stored = await self._snapshot_stores[device_id].async_load()
+        if not stored or not stored.get("endpoint"):
+            return False
+        # Yükleme sırasında canlı veri geldiyse onu ezme
+        if self.reported_endpoint(device_id) is not None:
+            return True
+
+        updated = dt_util.parse_datetime(stored.get("updated") or "")
+        updated = dt_util.as_utc(updated) if updated else dt_util.utcnow()
+        if self.stale_since is None or updated < self.stale_since:
+            self.stale_since = updated
+        self.data = {**(self.data or {}), device_id: stored["endpoint"]}
+        self.async_update_listeners()
+        _LOGGER.debug("Restored %s from the state saved at %s", device_id, updated)
+        return True
+
+    @callback
+    def _async_save_snapshots(
+        self,
+        previous: dict[str, dict[str, Any]] | None,
+        current: dict[str, dict[str, Any]],
+    ) -> None:
+        """Schedule a save of every endpoint that changed in the last poll."""
+        updated = dt_util.utcnow().isoformat()
+        for device_id, endpoint in current.items():
+            if previous is not None and previous.get(device_id) is endpoint:
+                continue
+            if (store := self._snapshot_stores.get(device_id)) is None:
+                continue
+            store.async_delay_save(
+                lambda endpoint=endpoint: {"endpoint": endpoint, "updated": updated},
+                SNAPSHOT_SAVE_DELAY,
+            )
+
+    async def _async_setup_refresh(self) -> None:
+        """Run a refresh shared by the entries being set up."""
+        try:
+            await self.async_refresh()
+        finally:
+            self._setup_refresh = None
+
+    def device_available(self, device_id: str) -> bool:
+        """Return whether a device's last good state may still be shown.
+
+        During an outage the last snapshot stays available until the stale
+        grace period of the device runs out.
+        """
+        if self.snapshot(device_id) is None:
+            return False
+        if self.last_update_success:
+            return True
+        grace = self._stale_grace.get(device_id, DEFAULT_STALE_GRACE)
+        return time.monotonic() - self._last_success < grace
+
+    @callback
+    def _async_schedule_stale_expiry(self) -> None:
+        """Redraw the entities when the next stale grace period runs out.
+
+        While polls keep failing the coordinator does not notify its
+        listeners, so without this the entities would keep showing the last
+        good state as available for the whole outage.
+        """
+        if self._unsub_stale_expiry is not None:
+            return
+        now = time.monotonic()
+        deadlines = [
+            deadline
+            for device_id in self._device_ids
+            if (
+                deadline := self._last_success
+                + self._stale_grace.get(device_id, DEFAULT_STALE_GRACE)
+            )
+            > now
+        ]
+        if deadlines:
+            self._unsub_stale_expiry = async_call_later(
+                self.hass, min(deadlines) - now, self._async_stale_expired
+            )
+
+    @callback
+    def _async_stale_expired(self, _now: datetime) -> None:
+        """Mark devices whose grace period ended as unavailable."""
+        self._unsub_stale_expiry = None
+        self.async_update_listeners()
+        # Süresi daha uzun olan cihazlar için sıradaki zamanlayıcı
+        self._async_schedule_stale_expiry()
+
+    def set_rate_limit(self, device_id: str, requests_per_minute: float) -> None:
+        """Set the request ceiling requested by a device's options.
+
+        The budget is shared by the whole account, so the lowest ceiling wins.
+        """
+        self._rate_limits[device_id] = requests_per_minute
+        self.limiter.requests_per_minute = min(self._rate_limits.values())
+
+    def set_stale_grace(self, device_id: str, grace: float) -> None:
+        """Set how long a device may show stale data during an outage."""
+        self._stale_grace[device_id] = grace
+
+    def set_publish_limits(
+        self,
+        device_id: str,
+        temperature_deadband: float = DEFAULT_TEMPERATURE_DEADBAND,
+        humidity_deadband: float = DEFAULT_HUMIDITY_DEADBAND,
+        publish_interval: float = DEFAULT_PUBLISH_INTERVAL,
+    ) -> None:
+        """Set how much a measurement must move before entities write it."""
+        self._publish_limits[device_id] = (
+            temperature_deadband,
+            humidity_deadband,
+            publish_interval,
+        )
+
+    def deadband(self, device_id: str, field: str) -> CosaDeadband | None:
+        """Return a new filter for a measured snapshot field of a device.
+
+        Returns None for fields that only change on commands.
+        """
+        temperature, humidity, interval = self._publish_limits.get(
+            device_id,
+            (
+                DEFAULT_TEMPERATURE_DEADBAND,
+                DEFAULT_HUMIDITY_DEADBAND,
+                DEFAULT_PUBLISH_INTERVAL,
+            ),
+        )
+        if field == "temperature":
+            return CosaDeadband(temperature, interval)
+        if field == "humidity":
+            return CosaDeadband(humidity, interval)
+        return None
+
+    @property
+    def stale(self) -> bool:
+        """Return True while the shown data is older than the last poll."""
+        return self.stale_since is not None
+
+    async def _async_request(
+        self,
+        method: str,
+        path: str,
+        data: dict[str, Any] | None = None,
+        cache_key: str | None = None,
+        priority: int = PRIORITY_POLL,
+    ) -> tuple[Any, int]:
+        """Call the API with the account token.
+
+        Returns the JSON body and the sequence number the request was issued
+        with; numbers increase monotonically per account, so the order of
+        responses can be told even when they arrive out of order.
+
+        A 401/403 triggers a single re-login shared by all concurrent
+        callers, after which the request is retried once.
+
+        With a cache_key the body is hashed and, when it matches the previous
+        response (or the server answers 304 to If-None-Match), the previously
+        decoded object is returned as is without decoding again.
+        """
+        cached = self._response_cache.get(cache_key) if cache_key else None
+
+        for attempt in range(2):
+            token = self.auth.token
+            sequence = next(self._sequence)
+            response = await self.client.async_request(
+                method,
+                path,
+                token=token,
+                data=data,
+                etag=cached.etag if cached else None,
+                priority=priority,
+            )
+            status, body, etag = response.status, response.body, response.etag
+            if status in (401, 403) and attempt == 0:
+                await self.auth.async_relogin(token)
+                continue
+            if status == 304 and cached is not None:
+                return cached.value, sequence
+            if status != 200:
+                raise CosaApiError(status, response.text)
+
+            if cache_key is None:
+                return json_loads(body), sequence
+
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            if cached is not None and cached.digest == digest:
+                cached.etag = etag
+                return cached.value, sequence
+
+            value = json_loads(body)
+            self._response_cache[cache_key] = _CachedResponse(digest, etag, value)
+            return value, sequence
+
+        raise CosaApiError(401, "Unauthorized after re-login")
+
+    async def _async_fetch_endpoints(
+        self,
+    ) -> tuple[dict[str, dict[str, Any]], bool, int]:
+        """Fetch every endpoint of the account keyed by device id.
+
+        Also returns whether the payload changed since the previous poll and
+        the sequence number of the request.
+        """
+        response_data, sequence = await self._async_request(
+            "get", API_GET_ENDPOINTS, cache_key=API_GET_ENDPOINTS
+        )
+        if response_data is self._endpoints_source:
+            return self._endpoints, False, sequence
+
+        _LOGGER.debug("Endpoints changed for account %s", self.email)
+        self._endpoints_source = response_data
+        self._endpoints = {
+            endpoint["id"]: endpoint
+            for endpoint in response_data.get("endpoints", [])
+            if "id" in endpoint
+        }
+        return self._endpoints, True, sequence
+
+    async def async_fetch_endpoint(
+        self, device_id: str, priority: int = PRIORITY_POLL
+    ) -> tuple[dict[str, Any], int]:
+        """Fetch a single endpoint and the sequence number of the request."""
+        response_data, sequence = await self._async_request(
+            "post",
+            API_GET_ENDPOINT,
+            {"endpoint": device_id},
+            cache_key=f"{API_GET_ENDPOINT}/{device_id}",
+            priority=priority,
+        )
+        return response_data.get("endpoint", {}), sequence
+
+    async def async_fetch_telemetries(
+        self, device_id: str, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Fetch the telemetry samples of a device between two instants."""
+        response_data, _ = await self._async_request(
+            "post",
+            API_GET_TELEMETRIES,
+            {
+                "endpoint": device_id,
+                "startDate": int(start.timestamp() * 1000),
+                "endDate": int(end.timestamp() * 1000),
+            },
+        )
+        return response_data.get("telemetries", [])
+
+    async def async_post(self, path: str, data: dict[str, Any]) -> bool:
+        """Post a command to the API and return whether it was accepted.
+
+        Results of requests sent before an accepted command are no longer
+        applied to its device.
+        """
+        _LOGGER.debug("Posting %s with data: %s", path, data)
+
+        try:
+            _, sequence = await self._async_request(
+                "post", path, data, priority=PRIORITY_COMMAND
+            )
+        except CosaApiError as ex:
+            _LOGGER.error(
+                "Failed to post %s. Status: %s, Response: %s",
+                path,
+                ex.status,
+                ex.body
+            )
+            return False
+        except Exception as ex:
+            _LOGGER.error("Failed to post %s: %s", path, ex)
+            return False
+
+        if (device_id := data.get("endpoint")) is not None:
+            self._device_sequence[device_id] = max(
+                self._device_sequence.get(device_id, 0), sequence
+            )
+        return True
+
+
+class _CachedResponse:
+    """Digest, ETag and decoded value of the last response to a request."""
+
+    __slots__ = ("digest", "etag", "value")
+
+    def __init__(self, digest: bytes, etag: str | None, value: Any) -> None:
+        """Initialize the cache entry."""
+        self.digest = digest
+        self.etag = etag
+        self.value = value
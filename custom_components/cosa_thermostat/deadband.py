@@ -0,0 +1,54 @@
+"""Deadband filter for published measurements."""
+from __future__ import annotations
+
+import time
+
+# 15.1 - 15.0 gibi farklar kayan noktada 0.1'in hemen altında kalır
+_EPSILON = 1e-9
+
+
+class CosaDeadband:
+    """Hold back small changes of a measured value.
+
+    A sample that moves at least the deadband away from the published value
+    is published right away. Smaller moves are held back, and once the
+    publish interval has passed the mean of every sample seen since the
+    last publish is published instead, so jitter is averaged rather than
+    dropped. A deadband of zero publishes every sample.
+    """
+
+    def __init__(self, deadband: float, interval: float) -> None:
+        """Initialize the filter."""
+        self.deadband = deadband
+        self.interval = interval
+        self.published: float | None = None
+        self._published_at = 0.0
+        self._total = 0.0
+        self._count = 0
+
+    def update(self, value: float | None, now: float | None = None) -> float | None:
+        """Feed a sample and return the value to publish."""
+        if value is None:
+            self.published = None
+            self._total, self._count = 0.0, 0
+            return None
+
+        now = time.monotonic() if now is None else now
+        self._total += value
+        self._count += 1
+
+        if (
+            self.published is None
+            or self.deadband <= 0
+            or abs(value - self.published) >= self.deadband - _EPSILON
+        ):
+            self._publish(value, now)
+        elif now - self._published_at >= self.interval:
+            self._publish(round(self._total / self._count, 2), now)
+        return self.published
+
+    def _publish(self, value: float, now: float) -> None:
+        """Publish a value and start a new averaging window."""
+        self.published = value
+        self._published_at = now
+        self._total, self._count = 0.0, 0
@@ -0,0 +1,46 @@
+"""Diagnostics support for Cosa Thermostat."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import CosaAccountCoordinator
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, CONF_WEBHOOK_ID, "auth_token"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: CosaAccountCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device_id = entry.data["device_id"]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "devices": len(coordinator.device_ids),
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "last_update_success": coordinator.last_update_success,
+            "push_active": coordinator.push_active,
+        },
+        "rate_limiter": {
+            "requests_per_minute": coordinator.limiter.requests_per_minute,
+            "queue_depth": coordinator.limiter.queue_depth,
+        },
+        "endpoint": coordinator.reported_endpoint(device_id),
+        "thermal_model": coordinator.thermal[device_id].as_dict(),
+        "metrics": coordinator.metrics.as_dict(),
+    }
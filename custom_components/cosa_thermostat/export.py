@@ -0,0 +1,334 @@
+"""Streaming telemetry export for Cosa Thermostat."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+import csv
+from datetime import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, DATA_EXPORTS
+from .coordinator import CosaAccountCoordinator
+from .telemetry import PAGE_SIZE, parse_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+
+COLUMNS = ("time", "temperature", "humidity", "combiState")
+
+# Aynı anda dışa aktarılan en fazla cihaz sayısı
+DEFAULT_PARALLEL_EXPORTS = 2
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+
+def export_rows(
+    samples: Iterable[dict[str, Any]], start: datetime, end: datetime
+) -> Iterator[dict[str, Any]]:
+    """Yield the export rows of the samples taken between start and end."""
+    for sample in samples:
+        timestamp = parse_timestamp(sample.get("createdAt"))
+        if timestamp is None or not start <= timestamp < end:
+            continue
+        yield {
+            "time": timestamp.isoformat(),
+            "temperature": sample.get("temperature"),
+            "humidity": sample.get("humidity"),
+            "combiState": sample.get("combiState"),
+        }
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Convert a service call time to UTC, reading naive times as local."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_utc(value)
+
+
+class _CsvFile:
+    """Append pages to a single CSV file."""
+
+    def __init__(self, base_path: Path) -> None:
+        """Initialize the target."""
+        self.path = base_path.with_suffix(".csv")
+
+    def reset(self) -> None:
+        """Delete a previous export."""
+        self.path.unlink(missing_ok=True)
+
+    def restore(self, checkpoint: dict[str, Any]) -> bool:
+        """Cut off a page written after the checkpoint; False if impossible."""
+        size = checkpoint.get("size", 0)
+        if not self.path.exists() or self.path.stat().st_size < size:
+            return False
+        os.truncate(self.path, size)
+        return True
+
+    def write(
+        self, page_start: datetime, rows: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Append rows and return the checkpoint fields of the file."""
+        with self.path.open("a", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, COLUMNS)
+            if file.tell() == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+            size = file.tell()
+        return {"size": size}
+
+
+class _ParquetDataset:
+    """Write every page as its own file of a Parquet dataset directory.
+
+    Parquet files cannot be appended to, so a directory of page files keeps
+    memory bounded and lets an interrupted export resume; pyarrow, pandas
+    and DuckDB all read the directory as one table.
+    """
+
+    def __init__(self, base_path: Path) -> None:
+        """Initialize the target; needs pyarrow."""
+        try:
+            # pylint: disable-next=import-outside-toplevel
+            import pyarrow as pa
+            # pylint: disable-next=import-outside-toplevel
+            import pyarrow.parquet as pq
+        except ImportError as err:
+            raise HomeAssistantError("Parquet export needs pyarrow installed") from err
+
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema(
+            [
+                ("time", pa.string()),
+                ("temperature", pa.float64()),
+                ("humidity", pa.float64()),
+                ("combiState", pa.string()),
+            ]
+        )
+        self.path = base_path.with_suffix(".parquet")
+
+    def reset(self) -> None:
+        """Delete a previous export."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def restore(self, checkpoint: dict[str, Any]) -> bool:
+        """Keep the pages written so far; a partial page is rewritten."""
+        return self.path.is_dir()
+
+    def write(
+        self, page_start: datetime, rows: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Write the rows of a page as one file."""
+        if rows:
+            self.path.mkdir(parents=True, exist_ok=True)
+            table = self._pa.Table.from_pylist(rows, schema=self._schema)
+            self._pq.write_table(
+                table, self.path / f"part-{page_start:%Y%m%dT%H%M%S}.parquet"
+            )
+        return {}
+
+
+def _load_checkpoint(path: Path) -> dict[str, Any] | None:
+    """Read a checkpoint file."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(path: Path, checkpoint: dict[str, Any]) -> None:
+    """Replace a checkpoint file atomically."""
+    temporary = path.with_name(f"{path.name}.tmp")
+    temporary.write_text(json.dumps(checkpoint), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+class CosaTelemetryExport:
+    """Export the telemetry of one thermostat to disk.
+
+    getTelemetries is paged one day at a time through an async generator
+    and each page is written before the next one is fetched, so memory use
+    does not depend on the date range. A checkpoint next to the export
+    holds the cursor after the last written page; a later run with the
+    same start and format continues from it, also to extend an export to
+    a newer end date.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: CosaAccountCoordinator,
+        device_id: str,
+        export_format: str,
+    ) -> None:
+        """Initialize the export."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._device_id = device_id
+        self._format = export_format
+        self._base_path = Path(hass.config.path(f"{DOMAIN}_export")) / slugify(
+            device_id
+        )
+        self._checkpoint_path = self._base_path.with_name(
+            f"{self._base_path.name}.{export_format}{CHECKPOINT_SUFFIX}"
+        )
+
+    async def async_pages(
+        self, start: datetime, end: datetime
+    ) -> AsyncIterator[tuple[datetime, datetime, list[dict[str, Any]]]]:
+        """Yield the telemetry of each page between start and end."""
+        cursor = start
+        while cursor < end:
+            page_end = min(cursor + PAGE_SIZE, end)
+            samples = await self._coordinator.async_fetch_telemetries(
+                self._device_id, cursor, page_end
+            )
+            yield cursor, page_end, samples
+            cursor = page_end
+
+    async def async_run(
+        self, start: datetime, end: datetime, resume: bool = True
+    ) -> dict[str, Any]:
+        """Export the range and return the path and row count."""
+        writer, checkpoint = await self._hass.async_add_executor_job(
+            self._open_target, start, resume
+        )
+
+        cursor = start
+        if checkpoint is not None and (
+            saved := parse_timestamp(checkpoint.get("cursor"))
+        ):
+            cursor = saved
+        rows_written = checkpoint.get("rows", 0) if checkpoint else 0
+        if cursor > start:
+            _LOGGER.debug("Resuming export of %s from %s", self._device_id, cursor)
+
+        async for page_start, page_end, samples in self.async_pages(cursor, end):
+            rows = list(export_rows(samples, page_start, page_end))
+            checkpoint = {
+                "start": start.isoformat(),
+                "format": self._format,
+                "cursor": page_end.isoformat(),
+                "rows": rows_written + len(rows),
+            }
+            await self._hass.async_add_executor_job(
+                self._write_page, writer, page_start, rows, checkpoint
+            )
+            rows_written += len(rows)
+
+        _LOGGER.debug(
+            "Exported %s telemetry rows of %s to %s",
+            rows_written,
+            self._device_id,
+            writer.path,
+        )
+        return {"path": str(writer.path), "rows": rows_written}
+
+    def _open_target(
+        self, start: datetime, resume: bool
+    ) -> tuple[_CsvFile | _ParquetDataset, dict[str, Any] | None]:
+        """Return the writer and the checkpoint to continue from, if any."""
+        self._base_path.parent.mkdir(parents=True, exist_ok=True)
+        writer: _CsvFile | _ParquetDataset = (
+            _ParquetDataset(self._base_path)
+            if self._format == FORMAT_PARQUET
+            else _CsvFile(self._base_path)
+        )
+
+        checkpoint = _load_checkpoint(self._checkpoint_path) if resume else None
+        if (
+            checkpoint is not None
+            and checkpoint.get("start") == start.isoformat()
+            and checkpoint.get("format") == self._format
+            and writer.restore(checkpoint)
+        ):
+            return writer, checkpoint
+
+        writer.reset()
+        self._checkpoint_path.unlink(missing_ok=True)
+        return writer, None
+
+    def _write_page(
+        self,
+        writer: _CsvFile | _ParquetDataset,
+        page_start: datetime,
+        rows: list[dict[str, Any]],
+        checkpoint: dict[str, Any],
+    ) -> None:
+        """Write a page, then move the checkpoint past it."""
+        checkpoint.update(writer.write(page_start, rows))
+        _save_checkpoint(self._checkpoint_path, checkpoint)
+
+
+async def async_export_telemetry(
+    hass: HomeAssistant,
+    devices: list[tuple[str, CosaAccountCoordinator, str]],
+    start: datetime,
+    end: datetime | None = None,
+    export_format: str = FORMAT_CSV,
+    resume: bool = True,
+    max_parallel: int = DEFAULT_PARALLEL_EXPORTS,
+) -> dict[str, dict[str, Any]]:
+    """Export the telemetry of many thermostats, a few at a time.
+
+    devices holds (result key, coordinator, device id) tuples. Returns the
+    outcome per result key. A device already being exported to the same
+    format, by this or another call, fails instead of sharing its file.
+    """
+    start = _as_utc(start)
+    end = _as_utc(end) if end is not None else dt_util.utcnow()
+    if end <= start:
+        raise HomeAssistantError("The export end must be after its start")
+
+    semaphore = asyncio.Semaphore(max_parallel)
+    running: set[tuple[str, str]] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_EXPORTS, set()
+    )
+
+    async def _async_export(
+        coordinator: CosaAccountCoordinator, device_id: str
+    ) -> dict[str, Any]:
+        # Aynı dosyaya ve checkpoint'e iki export aynı anda yazamaz
+        target = (slugify(device_id), export_format)
+        if target in running:
+            raise HomeAssistantError(
+                f"A {export_format} export of {device_id} is already running"
+            )
+        running.add(target)
+        try:
+            async with semaphore:
+                export = CosaTelemetryExport(
+                    hass, coordinator, device_id, export_format
+                )
+                return await export.async_run(start, end, resume)
+        finally:
+            running.discard(target)
+
+    outcomes = await asyncio.gather(
+        *(
+            _async_export(coordinator, device_id)
+            for _, coordinator, device_id in devices
+        ),
+        return_exceptions=True,
+    )
+
+    results: dict[str, dict[str, Any]] = {}
+    for (key, _, device_id), outcome in zip(devices, outcomes):
+        if isinstance(outcome, BaseException):
+            _LOGGER.warning("Telemetry export of %s failed: %s", device_id, outcome)
+            results[key] = {"success": False, "error": str(outcome)}
+        else:
+            results[key] = {"success": True, **outcome}
+    return results
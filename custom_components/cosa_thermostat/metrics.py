@@ -0,0 +1,147 @@
+"""Request and update metrics for Cosa Thermostat."""
+from __future__ import annotations
+
+from collections import Counter, deque
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_METRICS
+
+# Yüzdelikler için saklanan son ölçüm sayısı
+SAMPLE_SIZE = 500
+
+
+def _percentile(samples: deque[float], percent: float) -> float | None:
+    """Return a percentile of the samples in milliseconds."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return round(ordered[index] * 1000, 1)
+
+
+class EndpointMetrics:
+    """Counters and latency samples of one API path."""
+
+    __slots__ = ("requests", "errors", "bytes_received", "latencies")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.errors: Counter[str] = Counter()
+        self.bytes_received = 0
+        self.latencies: deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dict."""
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "bytes_received": self.bytes_received,
+            "latency_p50_ms": _percentile(self.latencies, 50),
+            "latency_p95_ms": _percentile(self.latencies, 95),
+            "latency_p99_ms": _percentile(self.latencies, 99),
+        }
+
+
+class CosaMetrics:
+    """Collect request and entity update metrics of an account."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.device_requests: Counter[str] = Counter()
+        self.update_times: dict[str, deque[float]] = {}
+        self._latencies: deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self.pushes = 0
+        self.pushes_ignored = 0
+        self.stale_results = 0
+
+    def record_request(
+        self,
+        path: str,
+        status: int | str,
+        elapsed: float,
+        size: int = 0,
+        device_id: str | None = None,
+    ) -> None:
+        """Record one HTTP call; status is a code or an exception name."""
+        metrics = self.endpoints.get(path)
+        if metrics is None:
+            metrics = self.endpoints[path] = EndpointMetrics()
+        metrics.requests += 1
+        metrics.bytes_received += size
+        metrics.latencies.append(elapsed)
+        self._latencies.append(elapsed)
+        if status not in (200, 304):
+            metrics.errors[str(status)] += 1
+        if device_id is not None:
+            self.device_requests[device_id] += 1
+
+    def record_push(self, accepted: int, ignored: int) -> None:
+        """Record endpoints received through the webhook."""
+        self.pushes += accepted
+        self.pushes_ignored += ignored
+
+    def record_stale_result(self) -> None:
+        """Record a response dropped for being older than the device state."""
+        self.stale_results += 1
+
+    def record_update(self, device_id: str, elapsed: float) -> None:
+        """Record the time an entity spent handling a coordinator update."""
+        samples = self.update_times.get(device_id)
+        if samples is None:
+            samples = self.update_times[device_id] = deque(maxlen=SAMPLE_SIZE)
+        samples.append(elapsed)
+
+    @property
+    def requests(self) -> int:
+        """Return the total number of requests."""
+        return sum(metrics.requests for metrics in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        """Return the total number of failed requests."""
+        return sum(
+            sum(metrics.errors.values()) for metrics in self.endpoints.values()
+        )
+
+    def latency(self, percent: float) -> float | None:
+        """Return a latency percentile over all endpoints in milliseconds."""
+        return _percentile(self._latencies, percent)
+
+    def update_time(self, device_id: str) -> float | None:
+        """Return the mean update handling time of a device in milliseconds."""
+        samples = self.update_times.get(device_id)
+        if not samples:
+            return None
+        return round(sum(samples) / len(samples) * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric as a dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_p50_ms": self.latency(50),
+            "latency_p95_ms": self.latency(95),
+            "endpoints": {
+                path: metrics.as_dict() for path, metrics in self.endpoints.items()
+            },
+            "device_requests": dict(self.device_requests),
+            "pushes": self.pushes,
+            "pushes_ignored": self.pushes_ignored,
+            "stale_results": self.stale_results,
+            "update_time_ms": {
+                device_id: self.update_time(device_id)
+                for device_id in self.update_times
+            },
+        }
+
+
+def get_metrics(hass: HomeAssistant, email: str) -> CosaMetrics:
+    """Return the metrics of an account, creating them on first use."""
+    all_metrics = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_METRICS, {})
+    if (metrics := all_metrics.get(email)) is None:
+        metrics = all_metrics[email] = CosaMetrics()
+    return metrics
@@ -0,0 +1,80 @@
+"""Parsed endpoint state for Cosa Thermostat."""
+from __future__ import annotations
+
+from typing import Any
+
+PRESET_TEMPERATURE_KEYS = {
+    "home": "homeTemperature",
+    "away": "awayTemperature",
+    "sleep": "sleepTemperature",
+    "custom": "customTemperature",
+}
+
+
+def _float(value: Any) -> float | None:
+    """Return value as a float, or None when it is missing or malformed."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def combi_state(combi_state: Any, operation_mode: Any) -> str:
+    """Return the combi state shown by the entities: heating, idle or off."""
+    if combi_state == "on" and operation_mode == "heating":
+        return "heating"
+    if combi_state == "off":
+        return "off"
+    return "idle"
+
+
+class CosaSnapshot:
+    """Typed view of one getEndpoint payload.
+
+    Built once per poll by the coordinator so entities read plain attributes
+    instead of walking the payload dict on every state read.
+    """
+
+    __slots__ = (
+        "name",
+        "temperature",
+        "humidity",
+        "option",
+        "mode",
+        "previous_option",
+        "previous_mode",
+        "operation_mode",
+        "combi_state",
+        "target_temperatures",
+        "target_temperature",
+    )
+
+    def __init__(self, endpoint: dict[str, Any]) -> None:
+        """Parse an endpoint payload."""
+        self.name: str | None = endpoint.get("name")
+        self.temperature = _float(endpoint.get("temperature"))
+        self.humidity = _float(endpoint.get("humidity"))
+        self.option: str | None = endpoint.get("option")
+        self.mode: str | None = endpoint.get("mode")
+        self.previous_option: str | None = endpoint.get("previousOption")
+        self.previous_mode: str | None = endpoint.get("previousMode")
+        self.operation_mode: str | None = endpoint.get("operationMode")
+
+        self.combi_state = combi_state(
+            endpoint.get("combiState", "unknown"), self.operation_mode
+        )
+
+        self.target_temperatures: dict[str, float | None] = {
+            preset: _float(endpoint.get(key))
+            for preset, key in PRESET_TEMPERATURE_KEYS.items()
+        }
+        self.target_temperature = (
+            _float(endpoint.get(f"{self.option}Temperature")) if self.option else None
+        )
+
+    @property
+    def heating(self) -> bool:
+        """Return True when the combi is actively heating."""
+        return self.combi_state == "heating"
@@ -0,0 +1,256 @@
+"""On-demand profiling of the integration's event loop work."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import cProfile
+import functools
+import json
+import logging
+import statistics
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from . import coordinator as coordinator_module
+from .api import CosaApiClient
+from .const import DOMAIN, DATA_PROFILER
+from .coordinator import CosaAccountCoordinator
+from .metrics import CosaMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+_MISSING = object()
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class CosaProfiler:
+    """Collect cProfile data and wall time spans while running.
+
+    Spans are captured by wrapping the measured methods for the length of
+    the run and restoring the originals afterwards, so nothing is measured
+    and nothing costs anything while no profile is running.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an idle profiler."""
+        self._profile = cProfile.Profile()
+        self._spans: list[tuple[str, float, float]] = []
+        self._restore: list[tuple[Any, str, Any]] = []
+        self._started = 0.0
+        self._stopped = 0.0
+
+    def start(self) -> None:
+        """Install the span hooks and start cProfile."""
+        # Entity güncellemeleri kendi sürelerini metriklere zaten yazıyor
+        original_record_update = CosaMetrics.record_update
+
+        def record_update(
+            metrics: CosaMetrics, device_id: str, elapsed: float
+        ) -> None:
+            original_record_update(metrics, device_id, elapsed)
+            end = time.perf_counter()
+            self._record("entity_update", end - elapsed, end)
+
+        self._patch(CosaMetrics, "record_update", record_update)
+        self._wrap_async(
+            CosaAccountCoordinator, "_async_update_data", "coordinator_cycle"
+        )
+        self._wrap_async(CosaApiClient, "_async_send", "http")
+        self._wrap(coordinator_module, "json_loads", "json_decode")
+        self._wrap(
+            CosaAccountCoordinator, "async_update_listeners", "update_listeners"
+        )
+
+        # Platform modülleri burada yüklenir, kurulumda zaten yüklü olurlar
+        from .climate import CosaThermostat  # pylint: disable=import-outside-toplevel
+        from .sensor import (  # pylint: disable=import-outside-toplevel
+            CosaDiagnosticSensor,
+            CosaRuntimeSensor,
+            CosaThermostatSensor,
+        )
+
+        for entity_class in (
+            CosaThermostat,
+            CosaThermostatSensor,
+            CosaRuntimeSensor,
+            CosaDiagnosticSensor,
+        ):
+            self._wrap(entity_class, "async_write_ha_state", "write_state")
+
+        self._started = time.perf_counter()
+        try:
+            self._profile.enable()
+        except ValueError as err:
+            self._unpatch()
+            raise HomeAssistantError(f"Cannot start cProfile: {err}") from err
+
+    def stop(self) -> None:
+        """Stop cProfile and restore the original methods."""
+        self._profile.disable()
+        self._stopped = time.perf_counter()
+        self._unpatch()
+
+    def _record(self, span: str, start: float, end: float) -> None:
+        """Keep a span unless the run is over.
+
+        Calls already in flight when the run stops finish through the
+        wrappers they started with and are dropped here.
+        """
+        if not self._stopped:
+            self._spans.append((span, start, end))
+
+    def _patch(self, owner: Any, name: str, replacement: Callable[..., Any]) -> None:
+        """Replace an attribute, remembering how to restore it."""
+        original = vars(owner).get(name, _MISSING)
+        setattr(owner, name, functools.wraps(getattr(owner, name))(replacement))
+        self._restore.append((owner, name, original))
+
+    def _unpatch(self) -> None:
+        """Restore every replaced attribute, newest first."""
+        while self._restore:
+            owner, name, original = self._restore.pop()
+            if original is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+    def _wrap(self, owner: Any, name: str, span: str) -> None:
+        """Record a span around every call of a function."""
+        original = getattr(owner, name)
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._record(span, start, time.perf_counter())
+
+        self._patch(owner, name, wrapper)
+
+    def _wrap_async(self, owner: Any, name: str, span: str) -> None:
+        """Record a span around every await of a coroutine function."""
+        original = getattr(owner, name)
+
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                self._record(span, start, time.perf_counter())
+
+        self._patch(owner, name, wrapper)
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        """Return count and wall time percentiles per span in milliseconds."""
+        durations: dict[str, list[float]] = {}
+        for name, start, end in self._spans:
+            durations.setdefault(name, []).append((end - start) * 1000)
+
+        result: dict[str, dict[str, float | int]] = {}
+        for name, values in sorted(durations.items()):
+            values.sort()
+            result[name] = {
+                "count": len(values),
+                "total_ms": round(sum(values), 3),
+                "p50_ms": round(statistics.median(values), 3),
+                "p95_ms": round(
+                    values[min(len(values) - 1, int(len(values) * 0.95))], 3
+                ),
+                "max_ms": round(values[-1], 3),
+            }
+        return result
+
+    def speedscope(self) -> dict[str, Any]:
+        """Return the spans as a speedscope evented profile.
+
+        Concurrent spans of the same name, like parallel HTTP requests, are
+        spread over lanes so the events of each lane nest properly.
+        """
+        frames: list[dict[str, str]] = []
+        frame_index: dict[str, int] = {}
+        lanes: dict[str, list[list[tuple[float, float]]]] = {}
+        for name, start, end in sorted(self._spans, key=lambda span: span[1]):
+            if name not in frame_index:
+                frame_index[name] = len(frames)
+                frames.append({"name": name})
+            name_lanes = lanes.setdefault(name, [])
+            for lane in name_lanes:
+                if lane[-1][1] <= start:
+                    lane.append((start, end))
+                    break
+            else:
+                name_lanes.append([(start, end)])
+
+        def _at(moment: float) -> float:
+            return round((moment - self._started) * 1000, 3)
+
+        profiles = []
+        for name, name_lanes in lanes.items():
+            for number, lane in enumerate(name_lanes, 1):
+                frame = frame_index[name]
+                events = []
+                for start, end in lane:
+                    events.append({"type": "O", "frame": frame, "at": _at(start)})
+                    events.append({"type": "C", "frame": frame, "at": _at(end)})
+                profiles.append(
+                    {
+                        "type": "evented",
+                        "name": f"{name} #{number}" if len(name_lanes) > 1 else name,
+                        "unit": "milliseconds",
+                        "startValue": 0,
+                        "endValue": _at(self._stopped),
+                        "events": events,
+                    }
+                )
+
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": "Cosa Thermostat",
+            "exporter": DOMAIN,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def write(self, base_path: str) -> tuple[str, str]:
+        """Write the pstats and speedscope files; return their paths."""
+        pstats_path = f"{base_path}.prof"
+        speedscope_path = f"{base_path}.speedscope.json"
+        self._profile.dump_stats(pstats_path)
+        with open(speedscope_path, "w", encoding="utf-8") as file:
+            json.dump(self.speedscope(), file)
+        return pstats_path, speedscope_path
+
+
+async def async_profile(hass: HomeAssistant, duration: float) -> dict[str, Any]:
+    """Profile the event loop for a number of seconds and save the results."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_PROFILER in domain_data:
+        raise HomeAssistantError("A Cosa Thermostat profile is already running")
+
+    profiler = domain_data[DATA_PROFILER] = CosaProfiler()
+    try:
+        profiler.start()
+        _LOGGER.info("Profiling for %s seconds", duration)
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            profiler.stop()
+    finally:
+        domain_data.pop(DATA_PROFILER, None)
+
+    stamp = dt_util.utcnow().strftime("%Y%m%d_%H%M%S")
+    base_path = hass.config.path(f"{DOMAIN}_profile_{stamp}")
+    pstats_path, speedscope_path = await hass.async_add_executor_job(
+        profiler.write, base_path
+    )
+    _LOGGER.info("Profile written to %s and %s", pstats_path, speedscope_path)
+    return {
+        "pstats": pstats_path,
+        "speedscope": speedscope_path,
+        "spans": profiler.summary(),
+    }
@@ -0,0 +1,19 @@
+"""Cosa cloud API paths and request priorities.
+
+Kept free of Home Assistant imports so the API client can be used and
+tested on its own.
+"""
+
+API_BASE_URL = "https://kiwi.cosa.com.tr"
+API_LOGIN = "/api/users/login"
+API_GET_ENDPOINTS = "/api/endpoints/getEndpoints/"
+API_GET_ENDPOINT = "/api/endpoints/getEndpoint"
+API_GET_TELEMETRIES = "/api/endpoints/getTelemetries"
+API_SET_TARGET_TEMPERATURES = "/api/endpoints/setTargetTemperatures"
+API_SET_MODE = "/api/endpoints/setMode"
+API_SET_OPTION = "/api/endpoints/setOption"
+API_SET_OPERATION_MODE = "/api/endpoints/setOperationMode"
+
+# Kullanıcı komutları arka plan sorgularından önce gönderilir
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
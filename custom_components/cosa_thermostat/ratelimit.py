@@ -0,0 +1,96 @@
+"""Per-account request budget for the Cosa cloud."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_RATE_LIMITERS, DEFAULT_REQUESTS_PER_MINUTE
+from .protocol import PRIORITY_COMMAND, PRIORITY_POLL  # noqa: F401
+
+# Boştayken biriktirilebilecek en fazla istek hakkı
+BURST = 10
+
+
+class CosaRateLimiter:
+    """Token bucket shared by every request of an account.
+
+    Requests take a token when one is available. Otherwise they wait in a
+    priority queue, where user commands are served before background polls,
+    so bursts are smoothed out instead of being throttled by the cloud.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE) -> None:
+        """Initialize the limiter with a full bucket."""
+        self._rate = requests_per_minute / 60
+        self._tokens = float(BURST)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def requests_per_minute(self) -> float:
+        """Return the current ceiling."""
+        return self._rate * 60
+
+    @requests_per_minute.setter
+    def requests_per_minute(self, value: float) -> None:
+        """Change the ceiling."""
+        self._refill()
+        self._rate = value / 60
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def async_acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Wait until a request may be sent."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule()
+        await future
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(BURST, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _schedule(self) -> None:
+        """Wake up when the next token is available."""
+        if self._timer is not None or not self._waiters:
+            return
+        delay = max((1 - self._tokens) / self._rate, 0)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    @callback
+    def _release(self) -> None:
+        """Hand out tokens to waiters in priority order."""
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            # İptal edilen istek token harcamaz
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+
+def get_rate_limiter(hass: HomeAssistant, email: str) -> CosaRateLimiter:
+    """Return the limiter of an account, creating it on first use."""
+    limiters = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_RATE_LIMITERS, {})
+    if (limiter := limiters.get(email)) is None:
+        limiter = limiters[email] = CosaRateLimiter()
+    return limiter
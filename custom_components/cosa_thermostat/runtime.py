@@ -0,0 +1,206 @@
+"""Boiler runtime and cycle accumulators for Cosa Thermostat."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, DATA_RUNTIME
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+CYCLE_RATE_WINDOW = timedelta(hours=1)
+
+
+def runtime_store(hass: HomeAssistant, device_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the runtime counters of a device."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.runtime.{device_id}")
+
+
+def _parse(value: str | None) -> datetime | None:
+    """Parse a stored timestamp."""
+    if not value or (parsed := dt_util.parse_datetime(value)) is None:
+        return None
+    return dt_util.as_utc(parsed)
+
+
+class CosaRuntimeTracker:
+    """Running heating counters of one thermostat.
+
+    Only heating transitions are recorded: a transition closes or opens a
+    segment and adds it to the counters, and reads add the open segment on
+    top. Both are constant time, however long the boiler has been tracked.
+    Daily and weekly counters reset at local midnight and on Monday.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_id: str) -> None:
+        """Initialize empty counters."""
+        self._store = runtime_store(hass, device_id)
+        self.loaded = False
+        self._day_start = dt_util.start_of_local_day()
+        self._segment_start: datetime | None = None
+        self._cycle_start: datetime | None = None
+        self._runtime_today = 0.0
+        self._runtime_week = 0.0
+        self.cycles = 0
+        self._completed_cycles = 0
+        self._completed_on_time = 0.0
+        self._recent_starts: deque[datetime] = deque()
+
+    @property
+    def heating(self) -> bool:
+        """Return whether a heating cycle is in progress."""
+        return self._segment_start is not None
+
+    async def async_load(self) -> None:
+        """Restore the counters saved before the last shutdown.
+
+        A cycle that was running when Home Assistant stopped is closed at the
+        time of the last save, since the boiler state during the downtime is
+        unknown.
+        """
+        if self.loaded:
+            return
+        stored = await self._store.async_load() or {}
+        if day_start := _parse(stored.get("day_start")):
+            self._day_start = day_start
+        self._runtime_today = stored.get("runtime_today", 0.0)
+        self._runtime_week = stored.get("runtime_week", 0.0)
+        self.cycles = stored.get("cycles", 0)
+        self._completed_cycles = stored.get("completed_cycles", 0)
+        self._completed_on_time = stored.get("completed_on_time", 0.0)
+        self._recent_starts = deque(
+            start
+            for value in stored.get("recent_starts", [])
+            if (start := _parse(value)) is not None
+        )
+        self._segment_start = _parse(stored.get("segment_start"))
+        self._cycle_start = _parse(stored.get("cycle_start"))
+        self.loaded = True
+
+        if self.heating and (saved := _parse(stored.get("saved"))):
+            self.update(False, saved)
+
+    @callback
+    def update(self, heating: bool, now: datetime | None = None) -> None:
+        """Record the heating state reported by a poll."""
+        if not self.loaded:
+            return
+        now = now or dt_util.utcnow()
+        self._roll(now)
+        if heating == self.heating:
+            # Isıtma sürerken kayıt bekletilir, kapanışta son hali yazılır
+            if heating:
+                self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            return
+
+        if heating:
+            self._segment_start = self._cycle_start = now
+            self.cycles += 1
+            self._recent_starts.append(now)
+        else:
+            self._add_runtime(now)
+            if self._cycle_start is not None:
+                self._completed_cycles += 1
+                self._completed_on_time += (now - self._cycle_start).total_seconds()
+            self._segment_start = self._cycle_start = None
+
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the saved counters, dropping any pending save."""
+        await self._store.async_remove()
+
+    def runtime_today(self, now: datetime | None = None) -> float:
+        """Return today's heating time in seconds."""
+        now = now or dt_util.utcnow()
+        self._roll(now)
+        return self._runtime_today + self._open_segment(now)
+
+    def runtime_week(self, now: datetime | None = None) -> float:
+        """Return this week's heating time in seconds."""
+        now = now or dt_util.utcnow()
+        self._roll(now)
+        return self._runtime_week + self._open_segment(now)
+
+    def cycles_per_hour(self, now: datetime | None = None) -> int:
+        """Return the number of cycles started in the last hour."""
+        cutoff = (now or dt_util.utcnow()) - CYCLE_RATE_WINDOW
+        while self._recent_starts and self._recent_starts[0] < cutoff:
+            self._recent_starts.popleft()
+        return len(self._recent_starts)
+
+    @property
+    def average_on_time(self) -> float | None:
+        """Return the mean length of completed cycles in seconds."""
+        if not self._completed_cycles:
+            return None
+        return self._completed_on_time / self._completed_cycles
+
+    def _open_segment(self, now: datetime) -> float:
+        """Return the heating time not yet added to the counters."""
+        if self._segment_start is None:
+            return 0.0
+        return max((now - self._segment_start).total_seconds(), 0.0)
+
+    def _add_runtime(self, until: datetime) -> None:
+        """Close the open segment at a point in time."""
+        elapsed = self._open_segment(until)
+        self._runtime_today += elapsed
+        self._runtime_week += elapsed
+        self._segment_start = until
+
+    def _roll(self, now: datetime) -> None:
+        """Reset the daily and weekly counters when a new period starts."""
+        day_start = dt_util.start_of_local_day(dt_util.as_local(now))
+        if day_start <= self._day_start:
+            return
+
+        # Gece yarısını geçen ısıtma süresi iki güne bölünür
+        if self.heating:
+            self._add_runtime(day_start)
+        week_start = day_start - timedelta(days=day_start.weekday())
+        if self._day_start < week_start:
+            self._runtime_week = 0.0
+        self._runtime_today = 0.0
+        self._day_start = day_start
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the counters to persist."""
+        return {
+            "saved": dt_util.utcnow().isoformat(),
+            "day_start": self._day_start.isoformat(),
+            "runtime_today": self._runtime_today,
+            "runtime_week": self._runtime_week,
+            "cycles": self.cycles,
+            "completed_cycles": self._completed_cycles,
+            "completed_on_time": self._completed_on_time,
+            "recent_starts": [start.isoformat() for start in self._recent_starts],
+            "segment_start": (
+                self._segment_start.isoformat() if self._segment_start else None
+            ),
+            "cycle_start": self._cycle_start.isoformat() if self._cycle_start else None,
+        }
+
+
+def get_runtime_tracker(hass: HomeAssistant, device_id: str) -> CosaRuntimeTracker:
+    """Return the tracker of a device, creating it on first use.
+
+    Trackers outlive entry reloads so unsaved counters are not lost.
+    """
+    trackers = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_RUNTIME, {})
+    if (tracker := trackers.get(device_id)) is None:
+        tracker = trackers[device_id] = CosaRuntimeTracker(hass, device_id)
+    return tracker
+
+
+async def async_remove_runtime(hass: HomeAssistant, device_id: str) -> None:
+    """Forget the counters of a device and delete them from disk."""
+    trackers = hass.data.get(DOMAIN, {}).get(DATA_RUNTIME, {})
+    if (tracker := trackers.pop(device_id, None)) is None:
+        tracker = CosaRuntimeTracker(hass, device_id)
+    await tracker.async_remove()
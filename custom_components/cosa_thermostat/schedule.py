@@ -0,0 +1,121 @@
+"""Weekly schedule evaluation for Cosa Thermostat."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any
+
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _weekday(key: Any) -> int | None:
+    """Return the weekday index (Monday is 0) of a schedule key."""
+    if isinstance(key, int) or (isinstance(key, str) and key.isdigit()):
+        day = int(key)
+        return day if 0 <= day < 7 else None
+    if isinstance(key, str) and len(key) >= 3:
+        for index, name in enumerate(WEEKDAYS):
+            if name.startswith(key.lower()):
+                return index
+    return None
+
+
+def _minute_of_day(value: Any) -> int | None:
+    """Parse "HH:MM" or a minute count into minutes after midnight."""
+    if isinstance(value, int):
+        return value if 0 <= value < MINUTES_PER_DAY else None
+    if not isinstance(value, str):
+        return None
+    try:
+        hours, minutes = value.split(":")[:2]
+        minute = int(hours) * 60 + int(minutes)
+    except ValueError:
+        return None
+    return minute if 0 <= minute < MINUTES_PER_DAY else None
+
+
+def _minute_of_week(moment: datetime) -> int:
+    """Return the minutes elapsed since Monday 00:00 of the week."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+class CosaSchedule:
+    """Weekly schedule of a thermostat, indexed by minute of the week.
+
+    Transitions are kept as sorted start minutes, so the active option and
+    the next change are found with a binary search. Consecutive entries with
+    the same option are merged since they do not change the setpoint.
+    """
+
+    __slots__ = ("_starts", "_options")
+
+    def __init__(self, transitions: list[tuple[int, str]]) -> None:
+        """Build the index from (minute of week, option) pairs."""
+        starts: list[int] = []
+        options: list[str] = []
+        for start, option in sorted(transitions):
+            if options and options[-1] == option:
+                continue
+            starts.append(start)
+            options.append(option)
+        # Haftanın ilk girişi son girişin devamıysa geçiş sayılmaz
+        if len(options) > 1 and options[0] == options[-1]:
+            del starts[0], options[0]
+        self._starts = starts
+        self._options = options
+
+    @classmethod
+    def from_payload(cls, schedule: Any) -> CosaSchedule | None:
+        """Parse the schedule of an endpoint payload.
+
+        The payload maps weekdays (names or 0-6) to lists of entries with a
+        start time ("time" or "start") and the option to switch to.
+        """
+        if not isinstance(schedule, dict):
+            return None
+
+        transitions: list[tuple[int, str]] = []
+        for day, entries in schedule.items():
+            weekday = _weekday(day)
+            if weekday is None or not isinstance(entries, list):
+                continue
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                minute = _minute_of_day(entry.get("time", entry.get("start")))
+                option = entry.get("option")
+                if minute is None or not option:
+                    continue
+                transitions.append((weekday * MINUTES_PER_DAY + minute, option))
+
+        return cls(transitions) if transitions else None
+
+    def option_at(self, moment: datetime) -> str:
+        """Return the option active at a local time."""
+        index = bisect_right(self._starts, _minute_of_week(moment)) - 1
+        # -1, bir önceki haftanın son girişine denk gelir
+        return self._options[index]
+
+    def next_transition(self, moment: datetime) -> tuple[datetime, str] | None:
+        """Return the local time and option of the next change after moment."""
+        if len(self._starts) < 2:
+            return None
+
+        minute = _minute_of_week(moment)
+        index = bisect_right(self._starts, minute)
+        start = self._starts[index % len(self._starts)]
+        if index == len(self._starts):
+            start += MINUTES_PER_WEEK
+
+        at = moment.replace(second=0, microsecond=0) + timedelta(minutes=start - minute)
+        return at, self._options[index % len(self._options)]
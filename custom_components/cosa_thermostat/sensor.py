@@ -1,6 +1,9 @@
 """Support for Cosa Thermostat sensors."""
 from __future__ import annotations
+from datetime import datetime, timedelta
 import logging
+import time
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -10,17 +13,21 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import (
     UnitOfTemperature,
+    UnitOfTime,
     PERCENTAGE,
+    EntityCategory,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
-    DataUpdateCoordinator,
 )
 
 from .const import DOMAIN
+from .coordinator import CosaAccountCoordinator
+from .models import CosaSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -57,6 +64,117 @@ SENSORS = [
     ),
 ]
 
+# Kombi çalışma sayaçları
+RUNTIME_SENSORS = [
+    SensorEntityDescription(
+        key="runtime_today",
+        name="Heating Time Today",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        icon="mdi:fire",
+    ),
+    SensorEntityDescription(
+        key="runtime_week",
+        name="Heating Time This Week",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        icon="mdi:fire",
+    ),
+    SensorEntityDescription(
+        key="boiler_cycles",
+        name="Boiler Cycles",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:counter",
+    ),
+    SensorEntityDescription(
+        key="cycles_per_hour",
+        name="Boiler Cycles per Hour",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:repeat",
+    ),
+    SensorEntityDescription(
+        key="average_on_time",
+        name="Average Heating Cycle",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        icon="mdi:timer-sand",
+    ),
+]
+
+TIME_TO_TARGET_SENSOR = SensorEntityDescription(
+    key="time_to_target",
+    name="Estimated Time to Target",
+    native_unit_of_measurement=UnitOfTime.MINUTES,
+    device_class=SensorDeviceClass.DURATION,
+    state_class=SensorStateClass.MEASUREMENT,
+    icon="mdi:timer-play-outline",
+)
+
+# Çalışan sayaçların yeniden hesaplanma aralığı
+RUNTIME_REFRESH_INTERVAL = timedelta(minutes=1)
+
+# Teşhis sensörleri, varsayılan olarak kapalı
+DIAGNOSTIC_SENSORS = [
+    SensorEntityDescription(
+        key="api_requests",
+        name="API Requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:cloud-sync",
+    ),
+    SensorEntityDescription(
+        key="api_errors",
+        name="API Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:cloud-alert",
+    ),
+    SensorEntityDescription(
+        key="api_latency",
+        name="API Latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:timer-outline",
+    ),
+    SensorEntityDescription(
+        key="update_time",
+        name="Update Handling Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:timer-cog-outline",
+    ),
+    SensorEntityDescription(
+        key="api_queue_depth",
+        name="API Queue Depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:tray-full",
+    ),
+]
+
+# Sensör anahtarı -> CosaSnapshot alanı
+SNAPSHOT_ATTRIBUTES = {
+    "combi_state": "combi_state",
+    "current_temperature": "temperature",
+    "target_temperature": "target_temperature",
+    "humidity": "humidity",
+}
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -77,6 +195,29 @@ async def async_setup_entry(
                     device_id
                 )
             )
+        entities.append(
+            CosaTimeToTargetSensor(
+                coordinator,
+                TIME_TO_TARGET_SENSOR,
+                device_id
+            )
+        )
+        for description in RUNTIME_SENSORS:
+            entities.append(
+                CosaRuntimeSensor(
+                    coordinator,
+                    description,
+                    device_id
+                )
+            )
+        for description in DIAGNOSTIC_SENSORS:
+            entities.append(
+                CosaDiagnosticSensor(
+                    coordinator,
+                    description,
+                    device_id
+                )
+            )
         
         async_add_entities(entities, False)
         _LOGGER.debug("Added %s sensor entities", len(entities))
@@ -89,7 +230,7 @@ class CosaThermostatSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: CosaAccountCoordinator,
         description: SensorEntityDescription,
         device_id: str,
     ) -> None:
@@ -99,6 +240,11 @@ class CosaThermostatSensor(CoordinatorEntity, SensorEntity):
         self._device_id = device_id
         self._attr_unique_id = f"{device_id}_{description.key}"
         self._attr_has_entity_name = True
+        self._last_written_state: tuple | None = None
+        self._deadband = coordinator.deadband(
+            device_id, SNAPSHOT_ATTRIBUTES.get(description.key, "")
+        )
+        self._measured_endpoint: dict[str, Any] | None = None
         
         _LOGGER.debug(
             "Initialized sensor: %s with unique_id: %s",
@@ -106,46 +252,207 @@ class CosaThermostatSensor(CoordinatorEntity, SensorEntity):
             self._attr_unique_id
         )
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        start = time.perf_counter()
+        snapshot = self.coordinator.snapshot(self._device_id)
+        value = self._value(snapshot)
+        if self._deadband is not None:
+            # Filtreye sadece yeni poll veya push ölçümü girer
+            reported = self.coordinator.reported_endpoint(self._device_id)
+            if value is None or reported is not self._measured_endpoint:
+                self._measured_endpoint = reported
+                value = self._deadband.update(value)
+            else:
+                value = self._deadband.published
+
+        # Değer veya erişilebilirlik değişmediyse durum yazma
+        state = (self.available, self.coordinator.stale_since, value)
+        if state != self._last_written_state:
+            self._last_written_state = state
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+        self.coordinator.metrics.record_update(
+            self._device_id, time.perf_counter() - start
+        )
+
+    def _value(self, snapshot: CosaSnapshot | None) -> Any:
+        """Return the sensor value from the parsed endpoint."""
+        return getattr(snapshot, SNAPSHOT_ATTRIBUTES[self.entity_description.key], None)
+
     @property
-    def native_value(self) -> str | float | None:
-        """Return the state of the sensor."""
-        try:
-            if not self.coordinator.data:
-                return None
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.device_available(self._device_id)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag data kept from before an outage."""
+        if not self.coordinator.stale:
+            return None
+        return {
+            "stale": True,
+            "stale_since": self.coordinator.stale_since.isoformat(),
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+
+class CosaTimeToTargetSensor(CosaThermostatSensor):
+    """Estimated heating time until the target temperature is reached."""
+
+    def _value(self, snapshot: CosaSnapshot | None) -> int | None:
+        """Return the estimate of the room model in whole minutes."""
+        if (
+            snapshot is None
+            or snapshot.temperature is None
+            or snapshot.target_temperature is None
+        ):
+            return None
+        estimate = self.coordinator.thermal[self._device_id].time_to_target(
+            snapshot.temperature, snapshot.target_temperature
+        )
+        if estimate is None:
+            return None
+        return round(estimate.total_seconds() / 60)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the fitted room model next to the stale flags."""
+        return {
+            **self.coordinator.thermal[self._device_id].as_dict(),
+            **(super().extra_state_attributes or {}),
+        }
+
+
+class CosaRuntimeSensor(CoordinatorEntity, SensorEntity):
+    """Heating runtime and cycle counters of a Cosa Thermostat."""
+
+    def __init__(
+        self,
+        coordinator: CosaAccountCoordinator,
+        description: SensorEntityDescription,
+        device_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._device_id = device_id
+        self._tracker = coordinator.runtime[device_id]
+        self._attr_unique_id = f"{device_id}_{description.key}"
+        self._attr_has_entity_name = True
+        self._last_written_state: float | int | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the counter when its shown value changed."""
+        value = self._value()
+        if value != self._last_written_state:
+            self._last_written_state = value
+            self._attr_native_value = value
+            self.async_write_ha_state()
 
-            data = self.coordinator.data
-            endpoint = data.get("endpoint", {})
-            
-            if self.entity_description.key == "combi_state":
-                combi_state = endpoint.get("combiState", "unknown")
-                operation_mode = endpoint.get("operationMode")
-                
-                if combi_state == "on" and operation_mode == "heating":
-                    return "heating"
-                elif combi_state == "off":
-                    return "off"
-                else:
-                    return "idle"
-                    
-            elif self.entity_description.key == "current_temperature":
-                temp = endpoint.get("temperature")
-                return float(temp) if temp is not None else None
-                
-            elif self.entity_description.key == "target_temperature":
-                current_option = endpoint.get("option")
-                if current_option:
-                    temp = endpoint.get(f"{current_option}Temperature")
-                    return float(temp) if temp is not None else None
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Advance a running counter between polls."""
+        self._handle_coordinator_update()
+
+    def _value(self) -> float | int | None:
+        """Return the counter rounded to what the sensor shows."""
+        tracker = self._tracker
+        key = self.entity_description.key
+        if key == "runtime_today":
+            return round(tracker.runtime_today() / 3600, 3)
+        if key == "runtime_week":
+            return round(tracker.runtime_week() / 3600, 3)
+        if key == "boiler_cycles":
+            return tracker.cycles
+        if key == "cycles_per_hour":
+            return tracker.cycles_per_hour()
+        if key == "average_on_time":
+            if (average := tracker.average_on_time) is None:
                 return None
-                
-            elif self.entity_description.key == "humidity":
-                humidity = endpoint.get("humidity")
-                return float(humidity) if humidity is not None else None
-                
-        except Exception as ex:
-            _LOGGER.error(
-                "Error getting value for sensor %s: %s",
-                self.entity_description.key,
-                ex
+            return round(average / 60, 1)
+        return None
+
+    @property
+    def available(self) -> bool:
+        """Counters stay available during outages."""
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_tick, RUNTIME_REFRESH_INTERVAL
             )
-            return None 
\ No newline at end of file
+        )
+        self._handle_coordinator_update()
+
+
+class CosaDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Request and update metrics of a Cosa Thermostat."""
+
+    def __init__(
+        self,
+        coordinator: CosaAccountCoordinator,
+        description: SensorEntityDescription,
+        device_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._device_id = device_id
+        self._attr_unique_id = f"{device_id}_{description.key}"
+        self._attr_has_entity_name = True
+
+    @property
+    def available(self) -> bool:
+        """Metrics are available even while the API is failing."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the state of the sensor."""
+        metrics = self.coordinator.metrics
+        key = self.entity_description.key
+        if key == "api_requests":
+            return metrics.requests
+        if key == "api_errors":
+            return metrics.errors
+        if key == "api_latency":
+            return metrics.latency(95)
+        if key == "update_time":
+            return metrics.update_time(self._device_id)
+        if key == "api_queue_depth":
+            return self.coordinator.limiter.queue_depth
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the per-endpoint breakdown."""
+        metrics = self.coordinator.metrics
+        key = self.entity_description.key
+        if key == "api_requests":
+            return {
+                "device_requests": metrics.device_requests.get(self._device_id, 0),
+                **{
+                    path: endpoint.requests
+                    for path, endpoint in metrics.endpoints.items()
+                },
+            }
+        if key == "api_errors":
+            return {
+                path: dict(endpoint.errors)
+                for path, endpoint in metrics.endpoints.items()
+                if endpoint.errors
+            }
+        if key == "api_latency":
+            return {"p50": metrics.latency(50), "p99": metrics.latency(99)}
+        return None
@@ -0,0 +1,303 @@
+"""Services for Cosa Thermostat."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
+    ATTR_PRESET_MODE,
+    HVACMode,
+)
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE, CONF_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    DATA_ACCOUNTS,
+    MODE_AUTO,
+    MODE_MANUAL,
+    MODE_SCHEDULE,
+    OPTION_FROZEN,
+    OPTION_HOME,
+)
+from .coordinator import CosaAccountCoordinator
+from .export import (
+    DEFAULT_PARALLEL_EXPORTS,
+    FORMAT_CSV,
+    FORMATS,
+    async_export_telemetry,
+)
+from .models import PRESET_TEMPERATURE_KEYS
+from .profiler import async_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BULK_SET = "bulk_set"
+SERVICE_PROFILE = "profile"
+SERVICE_EXPORT_TELEMETRY = "export_telemetry"
+ATTR_DEVICES = "devices"
+ATTR_DURATION = "duration"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+ATTR_RESUME = "resume"
+ATTR_MAX_PARALLEL = "max_parallel"
+
+# Aynı anda yazılan en fazla cihaz sayısı
+MAX_PARALLEL_WRITES = 8
+
+PRESET_MODES = [*PRESET_TEMPERATURE_KEYS, MODE_AUTO, MODE_SCHEDULE]
+
+DEVICE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_ENTITY_ID, "device"): cv.entity_id,
+            vol.Exclusive(CONF_DEVICE_ID, "device"): cv.string,
+            vol.Optional(ATTR_PRESET_MODE): vol.In(PRESET_MODES),
+            vol.Optional(ATTR_HVAC_MODE): vol.In([HVACMode.HEAT, HVACMode.OFF]),
+            vol.Optional(ATTR_TEMPERATURE): vol.All(
+                vol.Coerce(float), vol.Range(min=5, max=35)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ENTITY_ID, CONF_DEVICE_ID),
+)
+
+BULK_SET_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_DEVICES): vol.All(cv.ensure_list, [DEVICE_SCHEMA])}
+)
+
+EXPORT_TELEMETRY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(CONF_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_CSV): vol.In(FORMATS),
+        vol.Optional(ATTR_RESUME, default=True): cv.boolean,
+        vol.Optional(ATTR_MAX_PARALLEL, default=DEFAULT_PARALLEL_EXPORTS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=8)
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        )
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_bulk_set(call: ServiceCall) -> ServiceResponse:
+        """Apply presets and setpoints to many thermostats at once."""
+        results = await async_bulk_set(hass, call.data[ATTR_DEVICES])
+        return {"results": results} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        _async_bulk_set,
+        schema=BULK_SET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_export_telemetry(call: ServiceCall) -> ServiceResponse:
+        """Write the telemetry history of thermostats to the config dir."""
+        requests = [
+            {ATTR_ENTITY_ID: entity_id}
+            for entity_id in call.data.get(ATTR_ENTITY_ID, [])
+        ] + [
+            {CONF_DEVICE_ID: device_id}
+            for device_id in call.data.get(CONF_DEVICE_ID, [])
+        ]
+        if not requests:
+            # Hedef verilmezse yüklü tüm termostatlar
+            requests = [
+                {CONF_DEVICE_ID: device_id}
+                for coordinator in hass.data.get(DOMAIN, {})
+                .get(DATA_ACCOUNTS, {})
+                .values()
+                for device_id in sorted(coordinator.device_ids)
+            ]
+
+        devices = []
+        for request in requests:
+            coordinator, device_id = _resolve_device(hass, request)
+            key = request.get(ATTR_ENTITY_ID) or device_id
+            devices.append((key, coordinator, device_id))
+
+        results = await async_export_telemetry(
+            hass,
+            devices,
+            call.data[ATTR_START],
+            call.data.get(ATTR_END),
+            call.data[ATTR_FORMAT],
+            call.data[ATTR_RESUME],
+            call.data[ATTR_MAX_PARALLEL],
+        )
+        return {"results": results} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_TELEMETRY,
+        _async_export_telemetry,
+        schema=EXPORT_TELEMETRY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the event loop and save the results in the config dir."""
+        result = await async_profile(hass, call.data[ATTR_DURATION])
+        return result if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def async_bulk_set(
+    hass: HomeAssistant, requests: list[dict[str, Any]]
+) -> dict[str, dict[str, Any]]:
+    """Write every request concurrently and confirm them with one refresh.
+
+    Returns the outcome per requested entity or device id.
+    """
+    results: dict[str, dict[str, Any]] = {}
+    jobs: list[tuple[str, CosaAccountCoordinator, str, dict[str, Any]]] = []
+    for request in requests:
+        key = request.get(ATTR_ENTITY_ID) or request[CONF_DEVICE_ID]
+        try:
+            coordinator, device_id = _resolve_device(hass, request)
+            changes = _device_changes(coordinator, device_id, request)
+        except HomeAssistantError as err:
+            results[key] = {"success": False, "error": str(err)}
+            continue
+        jobs.append((key, coordinator, device_id, changes))
+
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_WRITES)
+
+    async def _async_apply(
+        coordinator: CosaAccountCoordinator, device_id: str, changes: dict[str, Any]
+    ) -> bool:
+        async with semaphore:
+            return await coordinator.command_queues[device_id].async_apply(**changes)
+
+    outcomes = await asyncio.gather(
+        *(
+            _async_apply(coordinator, device_id, changes)
+            for _, coordinator, device_id, changes in jobs
+        ),
+        return_exceptions=True,
+    )
+
+    # Her hesap tek bir getEndpoints ile doğrulanır
+    coordinators = {id(coordinator): coordinator for _, coordinator, _, _ in jobs}
+    await asyncio.gather(
+        *(coordinator.async_refresh() for coordinator in coordinators.values())
+    )
+
+    for (key, coordinator, device_id, _), outcome in zip(jobs, outcomes):
+        if queue := coordinator.command_queues.get(device_id):
+            queue.async_settle()
+        if isinstance(outcome, BaseException):
+            results[key] = {"success": False, "error": str(outcome)}
+        elif not outcome:
+            results[key] = {"success": False, "error": "Rejected by the Cosa API"}
+        else:
+            results[key] = {"success": True}
+
+    _LOGGER.debug("Bulk set results: %s", results)
+    return results
+
+
+def _resolve_device(
+    hass: HomeAssistant, request: dict[str, Any]
+) -> tuple[CosaAccountCoordinator, str]:
+    """Return the coordinator and Cosa device id a request targets."""
+    if entity_id := request.get(ATTR_ENTITY_ID):
+        entity = er.async_get(hass).async_get(entity_id)
+        if entity is None or entity.platform != DOMAIN:
+            raise HomeAssistantError(f"{entity_id} is not a Cosa thermostat")
+        entry = hass.config_entries.async_get_entry(entity.config_entry_id)
+        if entry is None or entry.entry_id not in hass.data.get(DOMAIN, {}):
+            raise HomeAssistantError(f"{entity_id} is not loaded")
+        return hass.data[DOMAIN][entry.entry_id], entry.data[CONF_DEVICE_ID]
+
+    device_id = request[CONF_DEVICE_ID]
+    for coordinator in hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {}).values():
+        if device_id in coordinator.device_ids:
+            return coordinator, device_id
+    raise HomeAssistantError(f"Unknown Cosa device {device_id}")
+
+
+def _device_changes(
+    coordinator: CosaAccountCoordinator, device_id: str, request: dict[str, Any]
+) -> dict[str, Any]:
+    """Translate a request into the mode, option and setpoint to write.
+
+    Mirrors what the climate entity sends for the same actions; the command
+    queue then skips every field the device already reports.
+    """
+    snapshot = coordinator.snapshot(device_id)
+    if snapshot is None:
+        raise HomeAssistantError(f"No data for Cosa device {device_id}")
+
+    preset = request.get(ATTR_PRESET_MODE)
+    hvac_mode = request.get(ATTR_HVAC_MODE)
+    temperature = request.get(ATTR_TEMPERATURE)
+
+    if hvac_mode == HVACMode.OFF:
+        if preset is not None or temperature is not None:
+            raise HomeAssistantError("Cannot combine hvac_mode off with other changes")
+        return {"option": OPTION_FROZEN}
+
+    changes: dict[str, Any] = {}
+    if preset in (MODE_AUTO, MODE_SCHEDULE):
+        changes["mode"] = preset
+    elif preset is not None:
+        changes.update(mode=MODE_MANUAL, option=preset)
+    elif hvac_mode == HVACMode.HEAT:
+        # Kapatılmadan önceki moda dön
+        if snapshot.previous_mode in (MODE_AUTO, MODE_SCHEDULE):
+            changes["mode"] = snapshot.previous_mode
+        else:
+            changes.update(
+                mode=MODE_MANUAL, option=snapshot.previous_option or OPTION_HOME
+            )
+
+    if temperature is not None:
+        if changes.get("mode") in (MODE_AUTO, MODE_SCHEDULE):
+            raise HomeAssistantError(
+                "A temperature can only be set together with a manual preset"
+            )
+        option = changes.get("option", snapshot.option)
+        if option not in PRESET_TEMPERATURE_KEYS:
+            raise HomeAssistantError(f"Preset {option} has no target temperature")
+        target_temperatures = dict(snapshot.target_temperatures)
+        target_temperatures[option] = temperature
+        changes.update(mode=MODE_MANUAL, target_temperatures=target_temperatures)
+
+    if not changes:
+        raise HomeAssistantError("Nothing to change")
+    return changes
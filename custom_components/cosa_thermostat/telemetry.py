@@ -0,0 +1,207 @@
+"""Telemetry backfill into long-term statistics for Cosa Thermostat."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .coordinator import CosaAccountCoordinator
+from .models import combi_state
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+BACKFILL_INTERVAL = timedelta(hours=1)
+# İlk kurulumda geriye doğru en fazla bu kadar veri çekilir
+MAX_BACKFILL = timedelta(days=7)
+PAGE_SIZE = timedelta(days=1)
+
+# statistic anahtarı: (telemetri alanı, birim, isim eki)
+SERIES = {
+    "temperature": ("temperature", UnitOfTemperature.CELSIUS, "Temperature"),
+    "humidity": ("humidity", PERCENTAGE, "Humidity"),
+    "heating": ("combiState", PERCENTAGE, "Heating"),
+}
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """Parse a telemetry timestamp given in epoch milliseconds or ISO format."""
+    if isinstance(value, (int, float)):
+        return dt_util.utc_from_timestamp(value / 1000)
+    if isinstance(value, str):
+        if (parsed := dt_util.parse_datetime(value)) is not None:
+            return dt_util.as_utc(parsed)
+    return None
+
+
+def sample_value(
+    key: str, sample: dict[str, Any], operation_mode: str | None = None
+) -> float | None:
+    """Return the numeric value of a series in a telemetry sample.
+
+    operation_mode is used for samples that do not carry their own.
+    """
+    field = SERIES[key][0]
+    value = sample.get(field)
+    if value is None:
+        return None
+    if key == "heating":
+        # Isıtma durumu saatlik doluluk oranı (%) olarak tutulur; sensörle
+        # aynı eşleme, soğutma modundaki "on" ısıtma sayılmaz
+        state = combi_state(value, sample.get("operationMode", operation_mode))
+        return 100.0 if state == "heating" else 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CosaTelemetryBackfill:
+    """Import telemetry history of a thermostat into recorder statistics.
+
+    Samples are paged from getTelemetries starting at a persisted cursor,
+    aggregated into hourly mean/min/max rows and imported in one batch per
+    series. Only complete hours are imported, so the cursor always sits on
+    an hour boundary and an interrupted run simply resumes from it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: CosaAccountCoordinator,
+        device_id: str,
+    ) -> None:
+        """Initialize the backfill job."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._device_id = device_id
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.telemetry.{device_id}"
+        )
+        self._running = False
+
+    def statistic_id(self, key: str) -> str:
+        """Return the external statistic id of a series."""
+        return f"{DOMAIN}:{slugify(self._device_id)}_{key}"
+
+    @callback
+    def async_start(self, entry: ConfigEntry) -> Callable[[], None]:
+        """Run the backfill now and then every hour.
+
+        Runs are tasks of the entry, so unloading it cancels a run in
+        progress.
+        """
+        name = f"{DOMAIN} telemetry backfill {self._device_id}"
+        entry.async_create_background_task(self._hass, self.async_backfill(), name)
+
+        @callback
+        def _async_scheduled(now: datetime) -> None:
+            entry.async_create_background_task(self._hass, self.async_backfill(), name)
+
+        return async_track_time_interval(self._hass, _async_scheduled, BACKFILL_INTERVAL)
+
+    async def async_backfill(self) -> None:
+        """Import every complete hour since the stored cursor."""
+        if self._running or "recorder" not in self._hass.config.components:
+            return
+        self._running = True
+        try:
+            await self._async_backfill()
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Telemetry backfill for %s failed: %s", self._device_id, ex)
+        finally:
+            self._running = False
+
+    async def _async_backfill(self) -> None:
+        """Page through telemetries and import them."""
+        stored = await self._store.async_load() or {}
+        end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        cursor = end - MAX_BACKFILL
+        if (last := stored.get("cursor")) and (parsed := parse_timestamp(last)):
+            cursor = max(parsed, cursor)
+
+        while cursor < end:
+            page_end = min(cursor + PAGE_SIZE, end)
+            samples = await self._coordinator.async_fetch_telemetries(
+                self._device_id, cursor, page_end
+            )
+            # Cihaz bu sırada kaldırıldıysa dur, imleç son sayfada kalır
+            if self._device_id not in self._coordinator.device_ids:
+                return
+            _LOGGER.debug(
+                "Fetched %s telemetry samples for %s between %s and %s",
+                len(samples),
+                self._device_id,
+                cursor,
+                page_end,
+            )
+            self._import(samples, cursor, page_end)
+
+            cursor = page_end
+            await self._store.async_save({"cursor": cursor.isoformat()})
+
+    def _import(
+        self, samples: list[dict[str, Any]], start: datetime, end: datetime
+    ) -> None:
+        """Aggregate samples per hour and import each series in one batch."""
+        buckets: dict[str, dict[datetime, list[float]]] = {key: {} for key in SERIES}
+        # Örnekte işletim modu yoksa cihazın bilinen modu kullanılır
+        operation_mode = (
+            self._coordinator.reported_endpoint(self._device_id) or {}
+        ).get("operationMode", "heating")
+        # Isı modeli için aynı örnekten sıcaklık ve ısıtma durumu
+        model_samples: tuple[list[float], list[float], list[float]] = ([], [], [])
+        for sample in samples:
+            timestamp = parse_timestamp(sample.get("createdAt"))
+            if timestamp is None or not start <= timestamp < end:
+                continue
+            hour = timestamp.replace(minute=0, second=0, microsecond=0)
+            values = {
+                key: sample_value(key, sample, operation_mode) for key in SERIES
+            }
+            for key, value in values.items():
+                if value is not None:
+                    buckets[key].setdefault(hour, []).append(value)
+            if values["temperature"] is not None and values["heating"] is not None:
+                model_samples[0].append(timestamp.timestamp())
+                model_samples[1].append(values["temperature"])
+                model_samples[2].append(values["heating"] / 100)
+
+        if thermal := self._coordinator.thermal.get(self._device_id):
+            thermal.add_samples(*model_samples)
+
+        name = self._coordinator.device_name(self._device_id)
+        for key, hours in buckets.items():
+            if not hours:
+                continue
+            _, unit, suffix = SERIES[key]
+            metadata = {
+                "has_mean": True,
+                "has_sum": False,
+                "name": f"{name} {suffix}",
+                "source": DOMAIN,
+                "statistic_id": self.statistic_id(key),
+                "unit_of_measurement": unit,
+            }
+            statistics = [
+                {
+                    "start": hour,
+                    "mean": sum(values) / len(values),
+                    "min": min(values),
+                    "max": max(values),
+                }
+                for hour, values in sorted(hours.items())
+            ]
+            async_add_external_statistics(self._hass, metadata, statistics)
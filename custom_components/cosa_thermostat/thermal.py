@@ -0,0 +1,168 @@
+"""Room thermal model for Cosa Thermostat."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import timedelta
+import math
+from typing import Any
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DATA_THERMAL
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+# Örnek başına unutma katsayısı; ~2000 örnek (5 dakikalıkta ~1 hafta) ağırlık taşır
+FORGETTING = 0.9995
+# Daha uzun boşluklu örnek çiftleri eğime katılmaz
+MAX_STEP = timedelta(minutes=30).total_seconds()
+MIN_SAMPLES = 48
+
+
+def thermal_store(hass: HomeAssistant, device_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the thermal model of a device."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.thermal.{device_id}")
+
+
+class CosaThermalModel:
+    """First order room model fitted by recursive least squares.
+
+    The temperature slope is modelled as ``dT/dt = gain * u - loss * T + offset``
+    where ``u`` is 1 while the combi heats and ``offset`` absorbs the outdoor
+    temperature. Only the 3x3 normal equations are kept: every telemetry page
+    adds its samples to them in one vectorized step with older samples
+    exponentially forgotten, and the coefficients are solved from the sums,
+    so refitting costs the same no matter how much history has been seen.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_id: str) -> None:
+        """Initialize an empty model."""
+        self._store = thermal_store(hass, device_id)
+        self.loaded = False
+        self._xtx = np.zeros((3, 3))
+        self._xty = np.zeros(3)
+        self.samples = 0
+        self.gain: float | None = None
+        self.loss: float | None = None
+        self.offset: float | None = None
+
+    async def async_load(self) -> None:
+        """Restore the accumulated sums."""
+        if self.loaded:
+            return
+        if stored := await self._store.async_load():
+            self._xtx = np.asarray(stored["xtx"], dtype=float).reshape(3, 3)
+            self._xty = np.asarray(stored["xty"], dtype=float)
+            self.samples = stored["samples"]
+            self._solve()
+        self.loaded = True
+
+    async def async_remove(self) -> None:
+        """Delete the saved model, dropping any pending save."""
+        await self._store.async_remove()
+
+    def add_samples(
+        self,
+        timestamps: Sequence[float],
+        temperatures: Sequence[float],
+        heating: Sequence[float],
+    ) -> None:
+        """Fold a batch of samples (epoch seconds, °C, 0/1) into the fit."""
+        times = np.asarray(timestamps, dtype=float)
+        if times.size < 2:
+            return
+        order = np.argsort(times)
+        times = times[order]
+        temps = np.asarray(temperatures, dtype=float)[order]
+        state = np.asarray(heating, dtype=float)[order]
+
+        steps = np.diff(times)
+        valid = (steps > 0) & (steps <= MAX_STEP)
+        count = int(valid.sum())
+        if not count:
+            return
+
+        # Eğim °C/saat cinsinden, her adımın başındaki duruma göre
+        slope = np.diff(temps)[valid] / steps[valid] * 3600
+        features = np.column_stack(
+            (state[:-1][valid], -temps[:-1][valid], np.ones(count))
+        )
+        decay = FORGETTING**count
+        self._xtx = self._xtx * decay + features.T @ features
+        self._xty = self._xty * decay + features.T @ slope
+        self.samples += count
+        self._solve()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _solve(self) -> None:
+        """Solve the normal equations for the model coefficients."""
+        self.gain = self.loss = self.offset = None
+        # Hep açık ya da hep kapalı geçmişte ısıtma etkisi ayrıştırılamaz
+        if self.samples < MIN_SAMPLES or np.linalg.matrix_rank(self._xtx) < 3:
+            return
+        coefficients = np.linalg.lstsq(self._xtx, self._xty, rcond=None)[0]
+        gain, loss, offset = (float(value) for value in coefficients)
+        # Fiziksel olmayan sonuçta model kullanılmaz
+        if not math.isfinite(gain + loss + offset) or gain <= 0 or loss < 0:
+            return
+        self.gain, self.loss, self.offset = gain, loss, offset
+
+    def time_to_target(self, current: float, target: float) -> timedelta | None:
+        """Return how long heating takes from current to target.
+
+        Returns zero when the target is already reached and None when there
+        is no fit or the target is above what the combi can reach.
+        """
+        if self.gain is None or self.loss is None or self.offset is None:
+            return None
+        if current >= target:
+            return timedelta()
+
+        rate = self.gain + self.offset - self.loss * current
+        if rate <= 0:
+            return None
+        if self.loss < 1e-6:
+            return timedelta(hours=(target - current) / rate)
+
+        # T(t) = Teq + (T0 - Teq) * e^(-loss * t)
+        equilibrium = (self.gain + self.offset) / self.loss
+        if target >= equilibrium:
+            return None
+        hours = math.log((equilibrium - current) / (equilibrium - target)) / self.loss
+        return timedelta(hours=hours)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the sums to persist."""
+        return {
+            "xtx": self._xtx.ravel().tolist(),
+            "xty": self._xty.tolist(),
+            "samples": self.samples,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fitted coefficients."""
+        return {
+            "samples": self.samples,
+            "gain_per_hour": self.gain,
+            "loss_per_hour": self.loss,
+            "offset_per_hour": self.offset,
+        }
+
+
+def get_thermal_model(hass: HomeAssistant, device_id: str) -> CosaThermalModel:
+    """Return the model of a device, creating it on first use."""
+    models = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_THERMAL, {})
+    if (model := models.get(device_id)) is None:
+        model = models[device_id] = CosaThermalModel(hass, device_id)
+    return model
+
+
+async def async_remove_thermal_model(hass: HomeAssistant, device_id: str) -> None:
+    """Forget the model of a device and delete it from disk."""
+    models = hass.data.get(DOMAIN, {}).get(DATA_THERMAL, {})
+    if (model := models.pop(device_id, None)) is None:
+        model = CosaThermalModel(hass, device_id)
+    await model.async_remove()
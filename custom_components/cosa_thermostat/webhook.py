@@ -0,0 +1,108 @@
+"""Push ingestion through a Home Assistant webhook."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+
+from aiohttp import web
+import voluptuous as vol
+
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .coordinator import CosaAccountCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Program girişi: başlangıç saati ("HH:MM" veya dakika) ve geçilecek seçenek
+SCHEDULE_ENTRY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("time"): vol.Any(str, int),
+        vol.Optional("start"): vol.Any(str, int),
+        vol.Required("option"): str,
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+# Sadece entegrasyonun okuduğu alanlar kabul edilir, gerisi atılır; push
+# gövdesi coordinator verisine karışır ve diske kaydedilir
+ENDPOINT_SCHEMA = vol.Schema(
+    {
+        vol.Required("id"): str,
+        vol.Optional("name"): str,
+        vol.Optional("temperature"): vol.Coerce(float),
+        vol.Optional("humidity"): vol.Coerce(float),
+        vol.Optional("option"): str,
+        vol.Optional("mode"): str,
+        vol.Optional("previousOption"): str,
+        vol.Optional("previousMode"): str,
+        vol.Optional("operationMode"): str,
+        vol.Optional("combiState"): str,
+        vol.Optional("homeTemperature"): vol.Coerce(float),
+        vol.Optional("awayTemperature"): vol.Coerce(float),
+        vol.Optional("sleepTemperature"): vol.Coerce(float),
+        vol.Optional("customTemperature"): vol.Coerce(float),
+        vol.Optional("schedule"): {vol.Any(str, int): [SCHEDULE_ENTRY_SCHEMA]},
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+# getEndpoint ve getEndpoints cevaplarıyla aynı biçim
+PUSH_SCHEMA = vol.Any(
+    vol.Schema({vol.Required("endpoint"): ENDPOINT_SCHEMA}, extra=vol.REMOVE_EXTRA),
+    vol.Schema(
+        {vol.Required("endpoints"): [ENDPOINT_SCHEMA]}, extra=vol.REMOVE_EXTRA
+    ),
+)
+
+
+@callback
+def async_register_webhook(
+    hass: HomeAssistant,
+    coordinator: CosaAccountCoordinator,
+    webhook_id: str,
+    name: str,
+) -> Callable[[], None]:
+    """Accept endpoint state pushes for an account; return the unregister call."""
+
+    async def _async_handle_push(
+        hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        """Validate a push and hand its endpoints to the coordinator."""
+        try:
+            payload = PUSH_SCHEMA(await request.json())
+        except ValueError as err:
+            _LOGGER.debug("Rejected push with invalid JSON: %s", err)
+            return web.json_response({"error": "invalid json"}, status=400)
+        except vol.Invalid as err:
+            _LOGGER.debug("Rejected invalid push: %s", err)
+            return web.json_response({"error": str(err)}, status=400)
+
+        endpoints = payload.get("endpoints") or [payload["endpoint"]]
+        accepted = sum(
+            coordinator.async_push_endpoint(endpoint["id"], endpoint)
+            for endpoint in endpoints
+        )
+        coordinator.metrics.record_push(accepted, len(endpoints) - accepted)
+        return web.json_response(
+            {"accepted": accepted, "ignored": len(endpoints) - accepted}
+        )
+
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        name,
+        webhook_id,
+        _async_handle_push,
+        allowed_methods=["POST"],
+    )
+    _LOGGER.debug(
+        "Accepting state pushes at %s", webhook.async_generate_path(webhook_id)
+    )
+
+    @callback
+    def _async_unregister() -> None:
+        webhook.async_unregister(hass, webhook_id)
+
+    return _async_unregister
@@ -0,0 +1,177 @@
+"""Tests for the Cosa API client against the mock Cosa cloud.
+
+The client is imported from the integration directory without running the
+integration's __init__, and Home Assistant is blocked from being imported,
+so these tests only need aiohttp and pytest.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import importlib
+from pathlib import Path
+import subprocess
+import sys
+import types
+from typing import Any
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_DIR = ROOT / "custom_components" / "cosa_thermostat"
+sys.path.insert(0, str(ROOT / "tools"))
+
+from mock_server import MockCosaServer  # noqa: E402
+
+# İstemci, entegrasyonun __init__'i çalışmadan bu isimle yüklenir
+PACKAGE = "cosa_api_under_test"
+
+
+def load_api() -> types.ModuleType:
+    """Import api.py and protocol.py from the integration directory."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.api")
+
+
+api = load_api()
+protocol = importlib.import_module(f"{PACKAGE}.protocol")
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Retry without sleeping."""
+    monkeypatch.setattr(api, "_backoff", lambda attempt: 0)
+
+
+def run_against(
+    server: MockCosaServer,
+    test: Callable[[Any, MockCosaServer], Awaitable[None]],
+    **client_options: Any,
+) -> None:
+    """Start the server, run test with a client pointed at it, then stop."""
+
+    async def _async_run() -> None:
+        runner = await server.async_start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                client = api.CosaApiClient(session, server.url, **client_options)
+                await test(client, server)
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_async_run())
+
+
+def test_import_without_home_assistant() -> None:
+    """The client module imports while Home Assistant cannot be imported."""
+    code = (
+        "import sys, types\n"
+        "sys.modules['homeassistant'] = None\n"
+        f"package = types.ModuleType({PACKAGE!r})\n"
+        f"package.__path__ = [{str(PACKAGE_DIR)!r}]\n"
+        f"sys.modules[{PACKAGE!r}] = package\n"
+        f"import {PACKAGE}.api\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_login_and_get_endpoints() -> None:
+    """A healthy server answers on the first attempt."""
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        login = await client.async_login("user@example.com", "secret")
+        response = await client.async_get_endpoints(login["authToken"])
+        assert len(response["endpoints"]) == 2
+        assert server.calls[protocol.API_GET_ENDPOINTS] == 1
+
+    run_against(MockCosaServer(devices=2), _test)
+
+
+def test_read_retried_on_server_errors() -> None:
+    """Reads are retried on 5xx and the last answer is returned."""
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        with pytest.raises(api.CosaApiError) as err:
+            await client.async_get_endpoints(server.issue_token())
+        assert err.value.status == 500
+        assert server.calls[protocol.API_GET_ENDPOINTS] == api.MAX_ATTEMPTS
+
+    run_against(MockCosaServer(error_rate=1.0), _test)
+
+
+def test_login_server_error_is_not_an_auth_error() -> None:
+    """An outage during login is not reported as rejected credentials."""
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        with pytest.raises(api.CosaApiError) as err:
+            await client.async_login("user@example.com", "secret")
+        assert not isinstance(err.value, api.CosaAuthError)
+        assert server.calls[protocol.API_LOGIN] == api.MAX_ATTEMPTS
+
+    run_against(MockCosaServer(error_rate=1.0), _test)
+
+
+def test_command_not_retried_on_server_error() -> None:
+    """A command that may have reached the device is sent only once."""
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        response = await client.async_request(
+            "post",
+            protocol.API_SET_MODE,
+            token=server.issue_token(),
+            data={"endpoint": "unknown", "mode": "manual"},
+            priority=protocol.PRIORITY_COMMAND,
+        )
+        assert response.status == 500
+        assert server.calls[protocol.API_SET_MODE] == 1
+
+    run_against(MockCosaServer(error_rate=1.0), _test)
+
+
+def test_command_retried_when_throttled() -> None:
+    """A command answered 429 never reached the device and is retried."""
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        response = await client.async_request(
+            "post",
+            protocol.API_SET_MODE,
+            token=server.issue_token(),
+            data={"endpoint": "unknown", "mode": "manual"},
+            priority=protocol.PRIORITY_COMMAND,
+        )
+        assert response.status == 429
+        assert server.calls[protocol.API_SET_MODE] == api.MAX_ATTEMPTS
+
+    run_against(MockCosaServer(throttle_rate=1.0), _test)
+
+
+def test_read_retried_on_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A hung read times out per attempt and raises after the last one."""
+    monkeypatch.setitem(api.TIMEOUTS, protocol.API_GET_ENDPOINTS, 0.1)
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        with pytest.raises(TimeoutError):
+            await client.async_get_endpoints(server.issue_token())
+        assert server.calls[protocol.API_GET_ENDPOINTS] == api.MAX_ATTEMPTS
+
+    run_against(MockCosaServer(timeout_rate=1.0, timeout=0.5), _test)
+
+
+def test_throttle_awaited_before_every_attempt() -> None:
+    """The throttle hook sees every attempt with the request priority."""
+    priorities: list[int] = []
+
+    async def _throttle(priority: int) -> None:
+        priorities.append(priority)
+
+    async def _test(client: Any, server: MockCosaServer) -> None:
+        with pytest.raises(api.CosaApiError):
+            await client.async_get_endpoints(server.issue_token())
+        assert priorities == [protocol.PRIORITY_POLL] * api.MAX_ATTEMPTS
+
+    run_against(MockCosaServer(error_rate=1.0), _test, throttle=_throttle)
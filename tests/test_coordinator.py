@@ -0,0 +1,104 @@
+"""Tests for the account coordinator's poll handling.
+
+These tests need Home Assistant 2024.11 or newer and are skipped without it.
+The API client is replaced by a scripted one, so no server is started.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import copy
+import json
+from pathlib import Path
+import sys
+import tempfile
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import frame  # noqa: E402
+
+from custom_components.cosa_thermostat.api import CosaResponse  # noqa: E402
+from custom_components.cosa_thermostat.auth import CosaAuth  # noqa: E402
+from custom_components.cosa_thermostat.const import API_GET_ENDPOINTS  # noqa: E402
+from custom_components.cosa_thermostat.coordinator import (  # noqa: E402
+    CosaAccountCoordinator,
+)
+
+FIXTURES = ROOT / "tools" / "fixtures" / "get_endpoint.json"
+BASE_URL = "http://127.0.0.1:9"
+
+
+def endpoint(**fields: Any) -> dict[str, Any]:
+    """Return a recorded endpoint payload with some fields replaced."""
+    recorded = json.loads(FIXTURES.read_text())[0]["endpoint"]
+    return {**copy.deepcopy(recorded), "id": "device1", **fields}
+
+
+class ScriptedClient:
+    """Answer getEndpoints with queued bodies, running a hook per request."""
+
+    def __init__(self) -> None:
+        self.bodies: list[bytes] = []
+        self.during_request: Callable[[], None] | None = None
+
+    def queue(self, *endpoints: dict[str, Any]) -> None:
+        """Queue the body of the next getEndpoints response."""
+        self.bodies.append(json.dumps({"endpoints": list(endpoints)}).encode())
+
+    async def async_request(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Return the next queued body as a 200 response."""
+        assert path == API_GET_ENDPOINTS
+        if (hook := self.during_request) is not None:
+            self.during_request = None
+            hook()
+        return CosaResponse(200, self.bodies.pop(0), kwargs.get("etag"))
+
+
+def run_with_coordinator(test: Callable[..., Any]) -> None:
+    """Run test with a coordinator tracking device1 and a scripted client."""
+
+    async def _async_run() -> None:
+        hass = HomeAssistant(tempfile.mkdtemp(prefix="cosa-test-"))
+        if hasattr(frame, "async_setup"):
+            frame.async_setup(hass)
+        auth = CosaAuth(hass, "test@example.com", "secret", "token", BASE_URL)
+        coordinator = CosaAccountCoordinator(hass, auth, BASE_URL)
+        coordinator.add_device("device1")
+        coordinator.client = client = ScriptedClient()
+        try:
+            await test(coordinator, client)
+        finally:
+            await coordinator.async_shutdown()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_async_run())
+
+
+def test_poll_discarded_by_a_command_is_applied_when_repeated() -> None:
+    """A body discarded because a command landed mid-poll is not cached."""
+
+    async def _test(coordinator: CosaAccountCoordinator, client: Any) -> None:
+        client.queue(endpoint(mode="manual"))
+        await coordinator.async_refresh()
+        assert coordinator.data["device1"]["mode"] == "manual"
+
+        # Komut, poll cevabı gelmeden önce yazılır ve poll'u eskitir
+        client.during_request = lambda: coordinator.async_set_endpoint(
+            "device1", {"mode": "schedule"}, next(coordinator._sequence)
+        )
+        client.queue(endpoint(mode="auto"))
+        await coordinator.async_refresh()
+        assert coordinator.data["device1"]["mode"] == "schedule"
+
+        client.queue(endpoint(mode="auto"))
+        await coordinator.async_refresh()
+        assert coordinator.data["device1"]["mode"] == "auto"
+
+    run_with_coordinator(_test)
@@ -0,0 +1,332 @@
+"""Micro-benchmark the coordinator update and entity state hot paths.
+
+Feeds recorded getEndpoint payloads through the account coordinator to N
+thermostats, each with its climate entity and state sensors, and measures
+the time, peak traced memory and state writes of one coordinator update
+for every mode, option and combi state combination. Each combination runs
+with integration debug logging off and on, so the cost of formatting log
+lines is visible. State writes are counted and the entity state and
+attributes are computed instead of being written to a state machine.
+
+Compare a change against the committed baseline, or save a new one on
+the main branch of the same machine:
+    python tools/benchmark.py --compare tools/benchmark_baseline.json
+    python tools/benchmark.py --save tools/benchmark_baseline.json
+
+Record fresh fixtures from a Cosa compatible API:
+    python tools/benchmark.py --record --api-url http://127.0.0.1:8080 \\
+        --email user@example.com --password secret
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import aiohttp  # noqa: E402
+
+from homeassistant.const import __version__ as HA_VERSION  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import frame  # noqa: E402
+
+from custom_components.cosa_thermostat.api import CosaApiClient  # noqa: E402
+from custom_components.cosa_thermostat.auth import CosaAuth  # noqa: E402
+from custom_components.cosa_thermostat.climate import CosaThermostat  # noqa: E402
+from custom_components.cosa_thermostat.const import API_GET_ENDPOINT  # noqa: E402
+from custom_components.cosa_thermostat.coordinator import (  # noqa: E402
+    CosaAccountCoordinator,
+)
+from custom_components.cosa_thermostat.sensor import (  # noqa: E402
+    SENSORS,
+    TIME_TO_TARGET_SENSOR,
+    CosaThermostatSensor,
+    CosaTimeToTargetSensor,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "get_endpoint.json"
+LOGGER_NAME = "custom_components.cosa_thermostat"
+
+MODES = ("manual", "auto", "schedule")
+OPTIONS = ("home", "away", "sleep", "custom", "frozen")
+COMBI_STATES = ("on", "off")
+
+
+def load_fixtures(path: Path) -> list[dict[str, Any]]:
+    """Return the endpoint payloads of recorded getEndpoint responses."""
+    return [response["endpoint"] for response in json.loads(path.read_text())]
+
+
+async def async_record(args: argparse.Namespace) -> None:
+    """Record the getEndpoint response of every thermostat of an account."""
+    async with aiohttp.ClientSession() as session:
+        client = CosaApiClient(session, args.api_url)
+        token = (await client.async_login(args.email, args.password))["authToken"]
+        endpoints = (await client.async_get_endpoints(token)).get("endpoints", [])
+        responses = []
+        for endpoint in endpoints:
+            response = await client.async_request(
+                "post", API_GET_ENDPOINT, token=token, data={"endpoint": endpoint["id"]}
+            )
+            responses.append(response.json())
+    args.fixtures.write_text(json.dumps(responses, indent=2, ensure_ascii=False) + "\n")
+    print(f"Recorded {len(responses)} endpoints to {args.fixtures}")
+
+
+def scenario_payloads(
+    fixtures: list[dict[str, Any]], devices: int, mode: str, option: str, combi: str
+) -> list[dict[str, dict[str, Any]]]:
+    """Return two alternating coordinator data sets for one scenario.
+
+    The room temperature moves between the two, so every update changes
+    the visible state the way a live poll does.
+    """
+    data_sets = []
+    for step in (0.0, 0.1):
+        data: dict[str, dict[str, Any]] = {}
+        for index in range(devices):
+            endpoint = copy.deepcopy(fixtures[index % len(fixtures)])
+            endpoint.update(
+                id=f"bench{index:04d}",
+                mode=mode,
+                option=option,
+                combiState=combi,
+                temperature=round(endpoint.get("temperature", 20.0) + step, 2),
+            )
+            data[endpoint["id"]] = endpoint
+        data_sets.append(data)
+    return data_sets
+
+
+def _count_writes(entity: Any, counter: list[int]) -> None:
+    """Replace the state write of an entity with a counted state render."""
+
+    def _write() -> None:
+        counter[0] += 1
+        # Durum makinesine yazmadan önce hesaplanan değerler
+        entity.state  # noqa: B018
+        entity.state_attributes  # noqa: B018
+        entity.extra_state_attributes  # noqa: B018
+
+    entity.async_write_ha_state = _write
+
+
+def build_entities(
+    hass: HomeAssistant, coordinator: CosaAccountCoordinator, device_ids: list[str]
+) -> tuple[int, list[int]]:
+    """Create the entities of every device as coordinator listeners."""
+    counter = [0]
+    entities: list[Any] = []
+    for device_id in device_ids:
+        coordinator.add_device(device_id)
+        entities.append(
+            CosaThermostat(coordinator, {"device_id": device_id, "auth_token": ""})
+        )
+        entities.extend(
+            CosaThermostatSensor(coordinator, description, device_id)
+            for description in SENSORS
+        )
+        entities.append(
+            CosaTimeToTargetSensor(coordinator, TIME_TO_TARGET_SENSOR, device_id)
+        )
+    for entity in entities:
+        entity.hass = hass
+        _count_writes(entity, counter)
+        coordinator.async_add_listener(entity._handle_coordinator_update)
+    return len(entities), counter
+
+
+def set_debug_logging(enabled: bool) -> None:
+    """Send integration debug logs to the null device, or silence them."""
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = False
+    if enabled:
+        handler = logging.StreamHandler(open(os.devnull, "w", encoding="utf-8"))
+        handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(levelname)s (%(threadName)s) [%(name)s] %(message)s"
+            )
+        )
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+    else:
+        logger.setLevel(logging.WARNING)
+
+
+def run_scenario(
+    coordinator: CosaAccountCoordinator,
+    data_sets: list[dict[str, dict[str, Any]]],
+    counter: list[int],
+    updates: int,
+    repeats: int,
+) -> dict[str, float]:
+    """Time coordinator updates and trace the memory peak of one of them."""
+    cycle = itertools.cycle(data_sets)
+    # Isınma: ilk güncelleme önbellekleri doldurur
+    for _ in range(len(data_sets)):
+        coordinator.async_set_updated_data(next(cycle))
+
+    timings = []
+    counter[0] = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(updates):
+            coordinator.async_set_updated_data(next(cycle))
+        timings.append((time.perf_counter() - start) / updates)
+    writes = counter[0] / (updates * repeats)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    coordinator.async_set_updated_data(next(cycle))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        # En iyi tekrar, makinedeki diğer yükten en az etkilenendir
+        "update_us": round(min(timings) * 1e6, 1),
+        "peak_kib": round((peak - baseline) / 1024, 1),
+        "writes_per_update": round(writes, 2),
+    }
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario and return the report."""
+    fixtures = load_fixtures(args.fixtures)
+    hass = HomeAssistant(tempfile.mkdtemp(prefix="cosa-bench-"))
+    if hasattr(frame, "async_setup"):
+        frame.async_setup(hass)
+
+    auth = CosaAuth(hass, "bench@test", "secret", "token", "http://127.0.0.1:9")
+    coordinator = CosaAccountCoordinator(hass, auth, "http://127.0.0.1:9")
+    device_ids = [f"bench{index:04d}" for index in range(args.devices)]
+    entity_count, counter = build_entities(hass, coordinator, device_ids)
+
+    results: dict[str, dict[str, float]] = {}
+    for debug in (False, True):
+        set_debug_logging(debug)
+        for mode, option, combi in itertools.product(MODES, OPTIONS, COMBI_STATES):
+            data_sets = scenario_payloads(fixtures, args.devices, mode, option, combi)
+            result = run_scenario(
+                coordinator, data_sets, counter, args.updates, args.repeats
+            )
+            result["entity_us"] = round(result["update_us"] / entity_count, 2)
+            key = f"{mode}/{option}/combi_{combi}/{'debug' if debug else 'quiet'}"
+            results[key] = result
+            print(
+                f"{key:40s} {result['update_us']:10.1f} us/update "
+                f"{result['entity_us']:7.2f} us/entity "
+                f"{result['peak_kib']:8.1f} KiB peak "
+                f"{result['writes_per_update']:6.1f} writes",
+                file=sys.stderr,
+            )
+    set_debug_logging(False)
+
+    await coordinator.async_shutdown()
+    await hass.async_stop(force=True)
+    return {
+        "devices": args.devices,
+        "entities": entity_count,
+        "updates": args.updates,
+        "repeats": args.repeats,
+        "python": sys.version.split()[0],
+        "homeassistant": HA_VERSION,
+        "total_update_us": round(
+            sum(result["update_us"] for result in results.values()), 1
+        ),
+        "results": results,
+    }
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Return what got slower, heavier or writes more often.
+
+    A single scenario runs for a few milliseconds, so time is compared over
+    all scenarios together; memory and state writes are compared per
+    scenario.
+    """
+    regressions = []
+    if report["total_update_us"] > baseline["total_update_us"] * (1 + tolerance):
+        regressions.append(
+            f"total update_us {baseline['total_update_us']} -> "
+            f"{report['total_update_us']}"
+        )
+    for key, result in report["results"].items():
+        if (base := baseline["results"].get(key)) is None:
+            continue
+        if result["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: peak_kib {base['peak_kib']} -> {result['peak_kib']}"
+            )
+        if result["writes_per_update"] > base["writes_per_update"]:
+            regressions.append(
+                f"{key}: writes_per_update {base['writes_per_update']} -> "
+                f"{result['writes_per_update']}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=50, help="thermostats per update")
+    parser.add_argument("--updates", type=int, default=50, help="updates per repeat")
+    parser.add_argument("--repeats", type=int, default=10, help="timed repeats")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument("--save", type=Path, help="write the report as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to check against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)"
+    )
+    parser.add_argument("--record", action="store_true", help="record fixtures and exit")
+    parser.add_argument("--api-url", help="Cosa compatible API to record from")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    if args.record:
+        if not (args.api_url and args.email and args.password):
+            parser.error("--record needs --api-url, --email and --password")
+        asyncio.run(async_record(args))
+        return
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    if baseline is not None and (baseline["devices"], baseline["updates"]) != (
+        args.devices,
+        args.updates,
+    ):
+        parser.error(
+            f"{args.compare} was saved with --devices {baseline['devices']} "
+            f"--updates {baseline['updates']}"
+        )
+
+    report = asyncio.run(async_run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.save:
+        args.save.write_text(text + "\n")
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
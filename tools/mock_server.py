@@ -0,0 +1,463 @@
+"""Local stand-in for the Cosa cloud API.
+
+Implements the endpoints listed in ``const.py`` against a set of simulated
+thermostats, with optional latency, throttling, server errors and timeouts.
+Per-endpoint call counters are served at ``GET /_mock/stats``.
+
+Usage:
+    python tools/mock_server.py --devices 50 --port 8080 --latency 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+import random
+import time
+from typing import Any
+import uuid
+
+from aiohttp import web
+
+API_LOGIN = "/api/users/login"
+API_GET_ENDPOINTS = "/api/endpoints/getEndpoints/"
+API_GET_ENDPOINT = "/api/endpoints/getEndpoint"
+API_GET_TELEMETRIES = "/api/endpoints/getTelemetries"
+API_SET_TARGET_TEMPERATURES = "/api/endpoints/setTargetTemperatures"
+API_SET_MODE = "/api/endpoints/setMode"
+API_SET_OPTION = "/api/endpoints/setOption"
+API_SET_OPERATION_MODE = "/api/endpoints/setOperationMode"
+
+TELEMETRY_STEP = 300  # saniye
+
+# Basit oda modeli (°C / saniye)
+HEATING_RATE = 0.002
+LOSS_RATE = 0.0005
+OUTSIDE_TEMPERATURE = 8.0
+HYSTERESIS = 0.2
+
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+
+def default_schedule() -> dict[str, list[dict[str, str]]]:
+    """Return a weekly schedule: home in the morning, sleep at night."""
+    return {
+        day: [
+            {"time": "06:30" if index < 5 else "08:30", "option": "home"},
+            {"time": "23:00", "option": "sleep"},
+        ]
+        for index, day in enumerate(WEEKDAYS)
+    }
+
+
+@dataclass
+class SimulatedThermostat:
+    """A thermostat with a very small room model."""
+
+    device_id: str
+    name: str
+    temperature: float = 19.0
+    humidity: float = 45.0
+    mode: str = "manual"
+    option: str = "home"
+    previous_mode: str = "manual"
+    previous_option: str = "home"
+    operation_mode: str = "heating"
+    combi_state: str = "off"
+    targets: dict[str, float] = field(
+        default_factory=lambda: {
+            "home": 21.0,
+            "away": 16.0,
+            "sleep": 18.0,
+            "custom": 20.0,
+        }
+    )
+    schedule: dict[str, list[dict[str, str]]] = field(default_factory=default_schedule)
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def scheduled_option(self, now: datetime) -> str:
+        """Return the option the weekly schedule selects at a local time."""
+        # Haftanın ilk girişinden önce önceki haftanın son girişi geçerli
+        entries = [entry for day in WEEKDAYS for entry in self.schedule.get(day, [])]
+        option = entries[-1]["option"] if entries else self.option
+        for day in WEEKDAYS[: now.weekday() + 1]:
+            for entry in self.schedule.get(day, []):
+                if day != WEEKDAYS[now.weekday()] or entry["time"] <= now.strftime(
+                    "%H:%M"
+                ):
+                    option = entry["option"]
+        return option
+
+    @property
+    def target(self) -> float:
+        """Return the active target temperature."""
+        if self.option == "frozen":
+            return 5.0
+        return self.targets.get(self.option, self.targets["home"])
+
+    def step(self) -> None:
+        """Advance the room model to now."""
+        now = time.monotonic()
+        elapsed, self.updated_at = now - self.updated_at, now
+        if self.mode == "schedule":
+            self.option = self.scheduled_option(datetime.now())
+
+        if self.combi_state == "on":
+            self.temperature += HEATING_RATE * elapsed
+        self.temperature -= LOSS_RATE * elapsed * (
+            (self.temperature - OUTSIDE_TEMPERATURE) / 10
+        )
+
+        if self.operation_mode != "heating":
+            self.combi_state = "off"
+        elif self.temperature < self.target - HYSTERESIS:
+            self.combi_state = "on"
+        elif self.temperature > self.target + HYSTERESIS:
+            self.combi_state = "off"
+
+    def payload(self, sparse: bool = False) -> dict[str, Any]:
+        """Return the endpoint payload as the API would."""
+        self.step()
+        data: dict[str, Any] = {
+            "id": self.device_id,
+            "name": self.name,
+            "option": self.option,
+            "mode": self.mode,
+        }
+        if sparse:
+            return data
+        data.update(
+            {
+                "temperature": round(self.temperature, 2),
+                "humidity": round(self.humidity, 1),
+                "previousOption": self.previous_option,
+                "previousMode": self.previous_mode,
+                "operationMode": self.operation_mode,
+                "combiState": self.combi_state,
+                "homeTemperature": self.targets["home"],
+                "awayTemperature": self.targets["away"],
+                "sleepTemperature": self.targets["sleep"],
+                "customTemperature": self.targets["custom"],
+                "schedule": self.schedule,
+            }
+        )
+        return data
+
+
+class MockCosaServer:
+    """aiohttp application emulating the Cosa cloud."""
+
+    def __init__(
+        self,
+        devices: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout: float = 30.0,
+        sparse_bulk: bool = False,
+        write_delay: float = 0.0,
+        device_ids: Sequence[str] = (),
+    ) -> None:
+        """Initialize the server with N simulated thermostats.
+
+        device_ids are used first, so a running Home Assistant entry can be
+        targeted; the remaining thermostats get random ids.
+        """
+        ids = list(dict.fromkeys(device_ids))
+        ids += [uuid.uuid4().hex[:24] for _ in range(devices - len(ids))]
+        self.thermostats = {
+            device_id: SimulatedThermostat(
+                device_id,
+                f"Room {index + 1}",
+                temperature=random.uniform(17, 22),
+                humidity=random.uniform(35, 55),
+            )
+            for index, device_id in enumerate(ids)
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.timeout_rate = timeout_rate
+        self.timeout = timeout
+        self.sparse_bulk = sparse_bulk
+        self.write_delay = write_delay
+        self.tokens: set[str] = set()
+        self.calls: Counter[str] = Counter()
+        self.statuses: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self.started = time.monotonic()
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post(API_LOGIN, self._login)
+        self.app.router.add_get(API_GET_ENDPOINTS, self._get_endpoints)
+        self.app.router.add_post(API_GET_ENDPOINT, self._get_endpoint)
+        self.app.router.add_post(API_GET_TELEMETRIES, self._get_telemetries)
+        self.app.router.add_post(API_SET_TARGET_TEMPERATURES, self._set_targets)
+        self.app.router.add_post(API_SET_MODE, self._set_mode)
+        self.app.router.add_post(API_SET_OPTION, self._set_option)
+        self.app.router.add_post(API_SET_OPERATION_MODE, self._set_operation_mode)
+        self.app.router.add_get("/_mock/stats", self._stats)
+        self.app.router.add_post("/_mock/reset", self._reset)
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Start serving and return the runner; ``self.url`` is set."""
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # pylint: disable=protected-access
+        self.url = f"http://{host}:{sockets[0].getsockname()[1]}"
+        return runner
+
+    def issue_token(self) -> str:
+        """Create a valid auth token without going through login."""
+        token = uuid.uuid4().hex
+        self.tokens.add(token)
+        return token
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count calls and inject latency and faults."""
+        path = request.path
+        if path.startswith("/_mock/"):
+            return await handler(request)
+
+        self.calls[path] += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = random.random()
+        if roll < self.timeout_rate:
+            self.statuses["timeout"] += 1
+            await asyncio.sleep(self.timeout)
+        roll -= self.timeout_rate
+        if roll < self.throttle_rate:
+            self.statuses["429"] += 1
+            return web.json_response({"error": "Too Many Requests"}, status=429)
+        roll -= self.throttle_rate
+        if roll < self.error_rate:
+            self.statuses["500"] += 1
+            return web.json_response({"error": "Internal Server Error"}, status=500)
+
+        if path != API_LOGIN and request.headers.get("authToken") not in self.tokens:
+            self.statuses["401"] += 1
+            return web.json_response({"error": "Unauthorized"}, status=401)
+
+        response = await handler(request)
+        self.statuses[str(response.status)] += 1
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_sent += len(response.body)
+        return response
+
+    def _thermostat(self, data: dict[str, Any]) -> SimulatedThermostat:
+        """Return the thermostat addressed by a request body."""
+        try:
+            return self.thermostats[data["endpoint"]]
+        except KeyError as ex:
+            raise web.HTTPNotFound(text="Unknown endpoint") from ex
+
+    async def _apply_later(self, apply) -> None:
+        """Apply a write after the configured propagation delay."""
+        if self.write_delay:
+            await asyncio.sleep(self.write_delay)
+        apply()
+
+    def _schedule_write(self, apply) -> None:
+        """Apply a write now or after the propagation delay."""
+        if self.write_delay:
+            asyncio.get_running_loop().create_task(self._apply_later(apply))
+        else:
+            apply()
+
+    async def _login(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        if not data.get("email") or not data.get("password"):
+            return web.json_response({"error": "Invalid credentials"}, status=401)
+        return web.json_response({"authToken": self.issue_token()})
+
+    async def _get_endpoints(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "endpoints": [
+                    thermostat.payload(self.sparse_bulk)
+                    for thermostat in self.thermostats.values()
+                ]
+            }
+        )
+
+    async def _get_endpoint(self, request: web.Request) -> web.Response:
+        thermostat = self._thermostat(await request.json())
+        return web.json_response({"endpoint": thermostat.payload()})
+
+    async def _get_telemetries(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        thermostat = self._thermostat(data)
+        start = int(data.get("startDate", 0)) // 1000
+        end = int(data.get("endDate", time.time() * 1000)) // 1000
+        start -= start % TELEMETRY_STEP
+        rng = random.Random(f"{thermostat.device_id}{start}")
+        telemetries = []
+        for timestamp in range(start, end, TELEMETRY_STEP):
+            heating = rng.random() < 0.3
+            telemetries.append(
+                {
+                    "createdAt": timestamp * 1000,
+                    "temperature": round(thermostat.target + rng.uniform(-1, 1), 2),
+                    "humidity": round(thermostat.humidity + rng.uniform(-3, 3), 1),
+                    "combiState": "on" if heating else "off",
+                }
+            )
+        return web.json_response({"telemetries": telemetries})
+
+    async def _set_targets(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        thermostat = self._thermostat(data)
+        targets = {
+            key: float(value)
+            for key, value in data.get("targetTemperatures", {}).items()
+            if key in thermostat.targets and value is not None
+        }
+        self._schedule_write(lambda: thermostat.targets.update(targets))
+        return web.json_response({"ok": True})
+
+    async def _set_mode(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        thermostat = self._thermostat(data)
+        mode = data.get("mode")
+        if mode not in ("manual", "auto", "schedule"):
+            return web.json_response({"error": "Invalid mode"}, status=400)
+
+        def apply() -> None:
+            thermostat.previous_mode, thermostat.mode = thermostat.mode, mode
+
+        self._schedule_write(apply)
+        return web.json_response({"ok": True})
+
+    async def _set_option(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        thermostat = self._thermostat(data)
+        option = data.get("option")
+        if option not in ("frozen", "home", "away", "sleep", "custom"):
+            return web.json_response({"error": "Invalid option"}, status=400)
+
+        def apply() -> None:
+            thermostat.previous_option, thermostat.option = thermostat.option, option
+
+        self._schedule_write(apply)
+        return web.json_response({"ok": True})
+
+    async def _set_operation_mode(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        thermostat = self._thermostat(data)
+        operation_mode = data.get("operationMode")
+        if operation_mode not in ("heating", "cooling", "remote"):
+            return web.json_response({"error": "Invalid operation mode"}, status=400)
+        self._schedule_write(
+            lambda: setattr(thermostat, "operation_mode", operation_mode)
+        )
+        return web.json_response({"ok": True})
+
+    def stats(self) -> dict[str, Any]:
+        """Return call counters since start or the last reset."""
+        elapsed = time.monotonic() - self.started
+        total = sum(self.calls.values())
+        return {
+            "elapsed": elapsed,
+            "calls": dict(self.calls),
+            "statuses": dict(self.statuses),
+            "total": total,
+            "requests_per_minute": total / elapsed * 60 if elapsed else 0.0,
+            "bytes_sent": self.bytes_sent,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset call counters."""
+        self.calls.clear()
+        self.statuses.clear()
+        self.bytes_sent = 0
+        self.started = time.monotonic()
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def _reset(self, request: web.Request) -> web.Response:
+        self.reset_stats()
+        return web.json_response({"ok": True})
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the fault injection options shared with the load test."""
+    parser.add_argument("--devices", type=int, default=1, help="simulated thermostats")
+    parser.add_argument(
+        "--device-id",
+        action="append",
+        default=[],
+        help="simulate a thermostat with this id (repeatable), e.g. of an HA entry",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx answers")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 answers")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of hung requests")
+    parser.add_argument("--write-delay", type=float, default=0.0, help="write propagation delay (s)")
+    parser.add_argument(
+        "--sparse-bulk",
+        action="store_true",
+        help="omit state fields from getEndpoints to force getEndpoint fallbacks",
+    )
+
+
+def server_from_arguments(args: argparse.Namespace) -> MockCosaServer:
+    """Build a server from parsed command line options."""
+    return MockCosaServer(
+        devices=args.devices,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        timeout_rate=args.timeout_rate,
+        sparse_bulk=args.sparse_bulk,
+        write_delay=args.write_delay,
+        device_ids=args.device_id,
+    )
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    server = server_from_arguments(args)
+    await server.async_start(args.host, args.port)
+    token = server.issue_token()
+    print(f"Mock Cosa cloud listening on {server.url}")
+    print(f"Auth token: {token}")
+    for thermostat in server.thermostats.values():
+        print(f"  {thermostat.device_id}  {thermostat.name}")
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
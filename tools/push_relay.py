@@ -0,0 +1,134 @@
+"""Push endpoint state to the integration's webhook.
+
+Acts as a local relay: polls getEndpoints on a Cosa compatible API and
+posts every endpoint whose state changed to a Home Assistant webhook, the
+way a cloud callback would. Without ``--api-url`` a mock cloud is started
+in process, so pushes can be verified with no real account; pass the
+device id of the webhook's entry with ``--device-id``, since pushes for
+devices the entry does not know are ignored.
+
+Usage:
+    python tools/push_relay.py --webhook-url http://localhost:8123/api/webhook/<id> \
+        --device-id <device id>
+    python tools/push_relay.py --webhook-url ... --api-url http://127.0.0.1:8080 \\
+        --email user@example.com --password secret
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sys
+from typing import Any
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_server import (  # noqa: E402
+    API_GET_ENDPOINTS,
+    API_LOGIN,
+    add_server_arguments,
+    server_from_arguments,
+)
+
+
+async def _async_login(
+    session: aiohttp.ClientSession, api_url: str, email: str, password: str
+) -> str:
+    """Log in and return the auth token."""
+    async with session.post(
+        f"{api_url}{API_LOGIN}", json={"email": email, "password": password}
+    ) as response:
+        response.raise_for_status()
+        return (await response.json())["authToken"]
+
+
+async def _async_relay(args: argparse.Namespace) -> None:
+    """Poll the API and push changed endpoints until interrupted."""
+    runner = None
+    if args.api_url is None:
+        if not args.device_id:
+            print(
+                "No --device-id given: the mock's random ids are unknown to Home "
+                "Assistant and every push will be ignored"
+            )
+        server = server_from_arguments(args)
+        runner = await server.async_start()
+        args.api_url = server.url
+        print(f"Mock Cosa cloud listening on {server.url}")
+        for thermostat in server.thermostats.values():
+            print(f"  {thermostat.device_id}  {thermostat.name}")
+
+    pushed: dict[str, dict[str, Any]] = {}
+    sent = accepted = ignored = 0
+    async with aiohttp.ClientSession() as session:
+        token = await _async_login(session, args.api_url, args.email, args.password)
+        try:
+            while args.count is None or sent < args.count:
+                async with session.get(
+                    f"{args.api_url}{API_GET_ENDPOINTS}", headers={"authToken": token}
+                ) as response:
+                    response.raise_for_status()
+                    endpoints = (await response.json()).get("endpoints", [])
+
+                changed = [
+                    endpoint
+                    for endpoint in endpoints
+                    if pushed.get(endpoint["id"]) != endpoint
+                ]
+                # Tekrar gönderim, webhook tarafındaki ayıklamayı dener
+                changed += [
+                    endpoint
+                    for endpoint in endpoints
+                    if endpoint not in changed and random.random() < args.duplicate_rate
+                ]
+
+                for endpoint in changed:
+                    async with session.post(
+                        args.webhook_url, json={"endpoint": endpoint}
+                    ) as response:
+                        result = await response.json(content_type=None)
+                    if response.status != 200:
+                        print(f"{endpoint['id']}: HTTP {response.status} {result}")
+                        continue
+                    pushed[endpoint["id"]] = endpoint
+                    sent += 1
+                    accepted += result.get("accepted", 0)
+                    ignored += result.get("ignored", 0)
+
+                print(
+                    f"pushed {len(changed):3d}  total sent {sent}  "
+                    f"accepted {accepted}  ignored {ignored}"
+                )
+                await asyncio.sleep(args.interval)
+        finally:
+            if runner is not None:
+                await runner.cleanup()
+
+
+def main() -> None:
+    """Parse arguments and run the relay."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--webhook-url", required=True, help="Home Assistant webhook URL")
+    parser.add_argument("--api-url", help="Cosa compatible API; default: in-process mock")
+    parser.add_argument("--email", default="relay@example.com")
+    parser.add_argument("--password", default="relay")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between polls")
+    parser.add_argument("--count", type=int, help="stop after this many pushes")
+    parser.add_argument(
+        "--duplicate-rate",
+        type=float,
+        default=0.0,
+        help="share of unchanged endpoints to push again",
+    )
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_async_relay(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
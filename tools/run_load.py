@@ -0,0 +1,203 @@
+"""Load test the Cosa Thermostat integration against the mock cloud.
+
+Boots a bare Home Assistant core with the integration's account coordinator
+tracking N simulated thermostats, sends random setpoint commands and
+reports request rate, command-to-state latency and event-loop time per poll
+cycle. The mock server runs on its own thread so its CPU time is not
+counted against the integration.
+
+Usage:
+    python tools/run_load.py --devices 200 --duration 300 --latency 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import frame  # noqa: E402
+
+from custom_components.cosa_thermostat.auth import CosaAuth  # noqa: E402
+from custom_components.cosa_thermostat.coordinator import (  # noqa: E402
+    CosaAccountCoordinator,
+)
+from mock_server import (  # noqa: E402
+    MockCosaServer,
+    add_server_arguments,
+    server_from_arguments,
+)
+
+
+class InstrumentedCoordinator(CosaAccountCoordinator):
+    """Account coordinator that records the cost of every poll cycle."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.cycle_wall: list[float] = []
+        self.cycle_cpu: list[float] = []
+
+    async def _async_update_data(self):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            return await super()._async_update_data()
+        finally:
+            self.cycle_wall.append(time.perf_counter() - wall)
+            self.cycle_cpu.append(time.thread_time() - cpu)
+
+
+def start_server_thread(server: MockCosaServer) -> asyncio.AbstractEventLoop:
+    """Run the mock server on a dedicated event loop thread."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.async_start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="mock-cosa", daemon=True).start()
+    started.wait()
+    return loop
+
+
+def percentiles(values: list[float]) -> dict[str, float | None]:
+    """Return p50/p95/max of a sample in milliseconds."""
+    if not values:
+        return {"p50": None, "p95": None, "max": None, "count": 0}
+    ordered = sorted(values)
+    return {
+        "p50": round(statistics.median(ordered) * 1000, 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+        "count": len(ordered),
+    }
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one load test and return its report."""
+    server = server_from_arguments(args)
+    server_loop = start_server_thread(server)
+    token = server.issue_token()
+
+    config_dir = tempfile.mkdtemp(prefix="cosa-load-")
+    hass = HomeAssistant(config_dir)
+    if hasattr(frame, "async_setup"):
+        frame.async_setup(hass)
+
+    auth = CosaAuth(hass, "load@test", "secret", token, server.url)
+    coordinator = InstrumentedCoordinator(hass, auth, server.url)
+    for device_id in server.thermostats:
+        coordinator.add_device(device_id)
+        coordinator.set_poll_intervals(
+            device_id, args.fast_interval, args.slow_interval, args.fast_window
+        )
+
+    # Komut gönderiminden durumun görünmesine kadar geçen süre
+    waiting: dict[str, tuple[float, float]] = {}
+    command_latency: list[float] = []
+    accept_latency: list[float] = []
+
+    def _check_commands() -> None:
+        now = time.perf_counter()
+        for device_id, (target, sent) in list(waiting.items()):
+            endpoint = coordinator.reported_endpoint(device_id) or {}
+            if endpoint.get("homeTemperature") == target:
+                command_latency.append(now - sent)
+                del waiting[device_id]
+
+    unsub = coordinator.async_add_listener(_check_commands)
+
+    server_loop.call_soon_threadsafe(server.reset_stats)
+    await coordinator.async_refresh()
+
+    async def _send_command() -> None:
+        device_id = random.choice(list(server.thermostats))
+        endpoint = coordinator.reported_endpoint(device_id) or {}
+        target = round(random.uniform(18, 24), 1)
+        temperatures = {
+            key: endpoint.get(f"{key}Temperature")
+            for key in ("home", "away", "sleep", "custom")
+        }
+        temperatures["home"] = target
+        sent = time.perf_counter()
+        waiting[device_id] = (target, sent)
+        queue = coordinator.command_queues[device_id]
+        if await queue.async_submit(mode="manual", target_temperatures=temperatures):
+            accept_latency.append(time.perf_counter() - sent)
+
+    tasks: set[asyncio.Task] = set()
+    deadline = time.monotonic() + args.duration
+    while (remaining := deadline - time.monotonic()) > 0:
+        if args.commands_per_minute:
+            await asyncio.sleep(min(remaining, random.expovariate(args.commands_per_minute / 60)))
+            if time.monotonic() < deadline:
+                task = hass.async_create_task(_send_command())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        else:
+            await asyncio.sleep(remaining)
+
+    if tasks:
+        await asyncio.wait(tasks, timeout=30)
+    unsub()
+    stats = server.stats()
+    await coordinator.async_shutdown()
+    await hass.async_stop(force=True)
+    server_loop.call_soon_threadsafe(server_loop.stop)
+
+    return {
+        "devices": args.devices,
+        "duration": args.duration,
+        "requests": stats["calls"],
+        "statuses": stats["statuses"],
+        "requests_per_minute": round(stats["requests_per_minute"], 2),
+        "requests_per_minute_per_device": round(
+            stats["requests_per_minute"] / max(args.devices, 1), 3
+        ),
+        "bytes_received": stats["bytes_sent"],
+        "poll_cycle_wall_ms": percentiles(coordinator.cycle_wall),
+        "poll_cycle_loop_cpu_ms": percentiles(coordinator.cycle_cpu),
+        "command_accept_ms": percentiles(accept_latency),
+        "command_to_state_ms": percentiles(command_latency),
+        "unconfirmed_commands": len(waiting),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_server_arguments(parser)
+    parser.add_argument("--duration", type=float, default=60, help="test length (s)")
+    parser.add_argument(
+        "--commands-per-minute", type=float, default=6, help="random setpoint commands"
+    )
+    parser.add_argument("--fast-interval", type=float, default=10)
+    parser.add_argument("--slow-interval", type=float, default=180)
+    parser.add_argument("--fast-window", type=float, default=60)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+    if not 1 <= args.devices <= 500:
+        parser.error("--devices must be between 1 and 500")
+
+    report = asyncio.run(async_run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()